@@ -1,5 +1,7 @@
 """ORCA keywords and constants"""
 
+from bisect import bisect_right
+
 # DFT Functionals
 DFT_FUNCTIONALS = {
     # Hybrid functionals
@@ -239,14 +241,6 @@ PERCENT_BLOCKS = {
     },
 }
 
-# All valid keywords (for diagnostics)
-ALL_KEYWORDS = {
-    **DFT_FUNCTIONALS,
-    **WAVEFUNCTION_METHODS,
-    **BASIS_SETS,
-    **JOB_TYPES,
-}
-
 # Common element symbols for geometry validation
 ELEMENTS = [
     "H",
@@ -340,11 +334,21 @@ ELEMENTS = [
 # %maxcore recommendations (in MB) based on system size
 MAXCORE_RECOMMENDATIONS = {
     "small": 1000,  # < 50 atoms
-    "medium": 2000,  # 50-100 atoms
-    "large": 4000,  # 100-200 atoms
-    "very_large": 8000,  # > 200 atoms
+    "medium": 2000,  # 50-99 atoms
+    "large": 4000,  # 100-199 atoms
+    "very_large": 8000,  # >= 200 atoms
 }
 
+# Atom-count bucket boundaries and the matching %maxcore values, in the
+# same order as MAXCORE_RECOMMENDATIONS; each boundary opens the next bucket
+_MAXCORE_THRESHOLDS = (50, 100, 200)
+_MAXCORE_VALUES = tuple(MAXCORE_RECOMMENDATIONS.values())
+
+
+def recommend_maxcore(n_atoms: int) -> int:
+    """Recommended %maxcore (MB per core) for a system with n_atoms atoms"""
+    return _MAXCORE_VALUES[bisect_right(_MAXCORE_THRESHOLDS, n_atoms)]
+
 
 # Additional DFT functionals (v0.5.2)
 ADDITIONAL_FUNCTIONALS = {
@@ -399,5 +403,25 @@ ADDITIONAL_PERCENT_BLOCKS = {
 DFT_FUNCTIONALS.update(ADDITIONAL_FUNCTIONALS)
 PERCENT_BLOCKS.update(ADDITIONAL_PERCENT_BLOCKS)
 
-# Update ALL_KEYWORDS to include new functionals
-ALL_KEYWORDS.update(ADDITIONAL_FUNCTIONALS)
+# All valid keywords (for diagnostics)
+ALL_KEYWORDS = {
+    **DFT_FUNCTIONALS,
+    **WAVEFUNCTION_METHODS,
+    **BASIS_SETS,
+    **JOB_TYPES,
+}
+
+# Immutable key sets, computed once at import and shared by all parsers
+DFT_FUNCTIONAL_KEYS = frozenset(DFT_FUNCTIONALS)
+WAVEFUNCTION_METHOD_KEYS = frozenset(WAVEFUNCTION_METHODS)
+BASIS_SET_KEYS = frozenset(BASIS_SETS)
+JOB_TYPE_KEYS = frozenset(JOB_TYPES)
+ALL_METHOD_KEYS = DFT_FUNCTIONAL_KEYS | WAVEFUNCTION_METHOD_KEYS
+ELEMENTS_SET = frozenset(ELEMENTS)
+ELEMENTS_SORTED = tuple(sorted(ELEMENTS))
+
+# Upper-case keyword -> canonical spelling, for case-insensitive lookup
+DFT_FUNCTIONALS_UPPER = {k.upper(): k for k in DFT_FUNCTIONALS}
+WAVEFUNCTION_METHODS_UPPER = {k.upper(): k for k in WAVEFUNCTION_METHODS}
+BASIS_SETS_UPPER = {k.upper(): k for k in BASIS_SETS}
+JOB_TYPES_UPPER = {k.upper(): k for k in JOB_TYPES}
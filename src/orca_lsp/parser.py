@@ -1,12 +1,46 @@
 """ORCA input file parser"""
 
 import re
+import sys
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple, Any
-from .keywords import DFT_FUNCTIONALS, WAVEFUNCTION_METHODS, BASIS_SETS, JOB_TYPES, ELEMENTS
-
-
-@dataclass
+from enum import IntEnum
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple, Any, Callable
+from .keywords import (
+    DFT_FUNCTIONAL_KEYS,
+    WAVEFUNCTION_METHOD_KEYS,
+    BASIS_SET_KEYS,
+    JOB_TYPE_KEYS,
+    ALL_METHOD_KEYS,
+    ELEMENTS,
+    ELEMENTS_SET,
+    DFT_FUNCTIONALS_UPPER,
+    WAVEFUNCTION_METHODS_UPPER,
+    BASIS_SETS_UPPER,
+    JOB_TYPES_UPPER,
+    recommend_maxcore,
+)
+
+# Upper-case element symbol -> canonical capitalization ("FE" -> "Fe")
+_ELEMENT_SYMBOLS = {e.upper(): e for e in ELEMENTS}
+
+# Parse results are allocated per atom/block on every re-parse; drop the
+# per-instance __dict__ where dataclasses support it (Python 3.10+)
+_DATACLASS_OPTIONS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Precompiled patterns for % block and geometry parsing
+_BLOCK_NAME_RE = re.compile(r"%\s*(\w+)")
+# An 'end' on the block's first line: after a space, or closing the line
+_INLINE_END_RE = re.compile(r" end|end$", re.IGNORECASE)
+# Geometry header: "* xyz 0 1"; the format starts with a letter, and charge and
+# multiplicity are optional as a pair
+_GEOM_HEADER_RE = re.compile(
+    r"\*\s*(?P<fmt>[A-Za-z]\w*)(?:\s+(?P<charge>[-+]?\d+)\s+(?P<mult>[-+]?\d+)(?!\S))?"
+)
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class SimpleInput:
     """Parsed simple input line (!)"""
 
@@ -22,7 +56,7 @@ class SimpleInput:
         return len(self.methods) > 0 or len(self.basis_sets) > 0
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class PercentBlock:
     """Parsed % block"""
 
@@ -37,7 +71,7 @@ class PercentBlock:
         return bool(self.name)
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Atom:
     """Represents an atom in geometry"""
 
@@ -49,10 +83,10 @@ class Atom:
 
     def is_valid(self) -> bool:
         """Check if atom data is valid"""
-        return self.element in ELEMENTS
+        return self.element in ELEMENTS_SET
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Geometry:
     """Parsed geometry section (* xyz ... *)"""
 
@@ -62,65 +96,263 @@ class Geometry:
     format_type: str = "xyz"  # xyz, int, etc.
     line_start: int = 0
     line_end: int = 0
+    # Atoms with unknown element symbols, collected by ORCAParser.parse_geometry
+    invalid_atoms: List[Atom] = field(default_factory=list)
+    # Header text after the format that is not a charge/multiplicity pair
+    invalid_header: bool = False
 
     def is_valid(self) -> bool:
         """Check if geometry section is valid"""
-        return len(self.atoms) > 0 and all(atom.is_valid() for atom in self.atoms)
+        # One set operation rather than an Atom.is_valid() call per atom
+        return len(self.atoms) > 0 and ELEMENTS_SET.issuperset(
+            [atom.element for atom in self.atoms]
+        )
+
+    def elements(self) -> List[str]:
+        """Element symbols in atom order"""
+        return [atom.element for atom in self.atoms]
 
+    def coordinates(self) -> "array[float]":
+        """Atom coordinates as one contiguous float64 buffer (x0, y0, z0, x1, ...)
 
-@dataclass
+        The buffer can be wrapped without copying for vectorized work, e.g.
+        ``numpy.frombuffer(geom.coordinates()).reshape(-1, 3)``.
+        """
+        coords = array("d")
+        for atom in self.atoms:
+            coords.extend((atom.x, atom.y, atom.z))
+        return coords
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class ParseResult:
     """Complete parse result for an ORCA input file"""
 
     simple_input: Optional[SimpleInput] = None
     percent_blocks: List[PercentBlock] = field(default_factory=list)
+    # First block of each name, for lookups without scanning percent_blocks
+    percent_blocks_by_name: Dict[str, PercentBlock] = field(default_factory=dict)
     geometry: Optional[Geometry] = None
     errors: List[Dict[str, Any]] = field(default_factory=list)
     warnings: List[Dict[str, Any]] = field(default_factory=list)
 
 
+def _parse_maxcore(block: PercentBlock, lines: List[str]) -> None:
+    """%maxcore 4000"""
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].lower() == "%maxcore":
+            try:
+                block.parameters["memory"] = int(parts[1])
+            except ValueError:
+                pass
+
+
+def _int_after(line: str, keyword: str) -> Optional[int]:
+    """Integer token following ``keyword`` in ``line`` (case-insensitive), if any"""
+    lowered = line.lower()
+    if keyword not in lowered:
+        return None
+    tokens = lowered.split()
+    if keyword in tokens:
+        i = tokens.index(keyword) + 1
+        if i < len(tokens) and tokens[i].isdecimal():
+            return int(tokens[i])
+    return None
+
+
+def _parse_pal(block: PercentBlock, lines: List[str]) -> None:
+    """%pal nprocs 4 end"""
+    for line in lines:
+        value = _int_after(line, "nprocs")
+        if value is not None:
+            block.parameters["nprocs"] = value
+
+
+def _parse_method(block: PercentBlock, lines: List[str]) -> None:
+    """%method D3BJ end"""
+    for line in lines:
+        stripped = line.strip().lower()
+        if "d3bj" in stripped:
+            block.parameters["dispersion"] = "D3BJ"
+        elif "d3" in stripped:
+            block.parameters["dispersion"] = "D3"
+        elif "d4" in stripped:
+            block.parameters["dispersion"] = "D4"
+
+
+def _parse_scf(block: PercentBlock, lines: List[str]) -> None:
+    """%scf maxiter 100 end"""
+    for line in lines:
+        value = _int_after(line, "maxiter")
+        if value is not None:
+            block.parameters["maxiter"] = value
+
+
+def _parse_eprnmr(block: PercentBlock, lines: List[str]) -> None:
+    """%eprnmr gtensor 1 end"""
+    for line in lines:
+        value = _int_after(line, "gtensor")
+        if value is not None:
+            block.parameters["gtensor"] = value
+
+
+def _parse_rirpa(block: PercentBlock, lines: List[str]) -> None:
+    """%rirpa nroots 10 end"""
+    for line in lines:
+        value = _int_after(line, "nroots")
+        if value is not None:
+            block.parameters["nroots"] = value
+
+
+# Block name -> parameter parser
+_BLOCK_PARSERS: Dict[str, Callable[[PercentBlock, List[str]], None]] = {
+    "maxcore": _parse_maxcore,
+    "pal": _parse_pal,
+    "method": _parse_method,
+    "scf": _parse_scf,
+    "eprnmr": _parse_eprnmr,
+    "rirpa": _parse_rirpa,
+}
+
+
+def _build_token_table() -> Dict[str, Tuple[str, str]]:
+    """Map upper-case tokens to (SimpleInput list attribute, canonical spelling)
+
+    Earlier groups take precedence (e.g. SCAN is a functional, not a job).
+    """
+    table: Dict[str, Tuple[str, str]] = {}
+    for attr, by_upper in (
+        ("methods", DFT_FUNCTIONALS_UPPER),
+        ("methods", WAVEFUNCTION_METHODS_UPPER),
+        ("basis_sets", BASIS_SETS_UPPER),
+        ("job_types", JOB_TYPES_UPPER),
+    ):
+        for upper, canonical in by_upper.items():
+            table.setdefault(upper, (attr, canonical))
+    return table
+
+
+_TOKEN_TABLE = _build_token_table()
+
+
+class DiagCode(IntEnum):
+    """Stable identifiers for parser diagnostics"""
+
+    MISSING_SIMPLE_INPUT = 1
+    MISSING_METHOD = 2
+    MISSING_BASIS = 3
+    MISSING_GEOMETRY = 4
+    INVALID_ELEMENT = 5
+    MISSING_MAXCORE = 6
+    INVALID_GEOMETRY_HEADER = 7
+
+
+# Message template per diagnostic code
+_DIAG_MESSAGES: Dict[DiagCode, str] = {
+    DiagCode.MISSING_SIMPLE_INPUT: "Missing simple input line (!) with method and basis set",
+    DiagCode.MISSING_METHOD: "No method specified in simple input (e.g., B3LYP, HF, MP2)",
+    DiagCode.MISSING_BASIS: "No basis set specified in simple input (e.g., def2-TZVP, 6-31G*)",
+    DiagCode.MISSING_GEOMETRY: "Missing geometry section (* xyz charge multiplicity ...)",
+    DiagCode.INVALID_ELEMENT: "Invalid element symbol: {element}",
+    DiagCode.INVALID_GEOMETRY_HEADER: (
+        "Invalid geometry header, expected charge and multiplicity (* xyz 0 1)"
+    ),
+    DiagCode.MISSING_MAXCORE: (
+        "Missing %maxcore setting. Recommended for this system: %maxcore {maxcore} (MB per core)"
+    ),
+}
+
+
+def _diagnostic(code: DiagCode, severity: str, line: int, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a diagnostic entry, formatting the message template with ``args``"""
+    message = _DIAG_MESSAGES[code]
+    if args:
+        message = message.format(**args)
+    return {"code": code, "message": message, "line": line, "severity": severity}
+
+
+def _error(code: DiagCode, line: int = 0, **args: Any) -> Dict[str, Any]:
+    """Build an error diagnostic entry"""
+    return _diagnostic(code, "error", line, args)
+
+
+def _warning(code: DiagCode, line: int = 0, **args: Any) -> Dict[str, Any]:
+    """Build a warning diagnostic entry"""
+    return _diagnostic(code, "warning", line, args)
+
+
 class ORCAParser:
     """Parser for ORCA input files"""
 
     def __init__(self) -> None:
-        self.dft_functionals = set(DFT_FUNCTIONALS.keys())
-        self.wavefunction_methods = set(WAVEFUNCTION_METHODS.keys())
-        self.basis_sets = set(BASIS_SETS.keys())
-        self.job_types = set(JOB_TYPES.keys())
-        self.all_methods = self.dft_functionals | self.wavefunction_methods
+        self.dft_functionals = DFT_FUNCTIONAL_KEYS
+        self.wavefunction_methods = WAVEFUNCTION_METHOD_KEYS
+        self.basis_sets = BASIS_SET_KEYS
+        self.job_types = JOB_TYPE_KEYS
+        self.all_methods = ALL_METHOD_KEYS
+
+        self._token_table = _TOKEN_TABLE
+
+        # Recent results by content; LSP clients often resend unchanged buffers
+        self._parse_cache = lru_cache(maxsize=32)(self.parse)
+
+    def parse_cached(self, content: str) -> ParseResult:
+        """Parse content, reusing the result of a recent identical parse
+
+        The returned ParseResult may be shared with other callers and must be
+        treated as read-only.
+        """
+        return self._parse_cache(content)
+
+    def cache_clear(self) -> None:
+        """Forget every result remembered by ``parse_cached``"""
+        self._parse_cache.cache_clear()
 
     def parse(self, content: str) -> ParseResult:
         """Parse complete ORCA input file"""
         result = ParseResult()
-        lines = content.split("\n")
-
+        # splitlines matches pygls' line model and drops the '\r' of CRLF files
+        lines = content.splitlines()
+        # Strip every line once; the block and geometry parsers reuse this
+        stripped_lines = [line.strip() for line in lines]
+
+        # Single pass: each sub-parser consumes its lines and hands back the
+        # index of the last one, so no line is visited twice
+        n_lines = len(lines)
         i = 0
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
+        while i < n_lines:
+            stripped = stripped_lines[i]
 
             # Skip empty lines and comments
-            if not stripped or stripped.startswith("#"):
+            if not stripped:
+                i += 1
+                continue
+
+            # Dispatch on the leading character
+            lead = stripped[0]
+            if lead == "#":
                 i += 1
                 continue
 
             # Parse simple input line (!)
-            if stripped.startswith("!"):
+            if lead == "!":
                 result.simple_input = self.parse_simple_input(stripped, i)
                 i += 1
                 continue
 
             # Parse % blocks
-            if stripped.startswith("%"):
-                block, end_line = self.parse_percent_block(lines, i)
+            if lead == "%":
+                block, end_line = self.parse_percent_block(lines, i, stripped_lines)
                 if block:
                     result.percent_blocks.append(block)
+                    result.percent_blocks_by_name.setdefault(block.name, block)
                 i = end_line + 1
                 continue
 
             # Parse geometry section
-            if stripped.startswith("*"):
-                geom, end_line = self.parse_geometry(lines, i)
+            if lead == "*":
+                geom, end_line = self.parse_geometry(lines, i, stripped_lines)
                 if geom:
                     result.geometry = geom
                 i = end_line + 1
@@ -137,56 +369,46 @@ class ORCAParser:
         """Parse simple input line starting with !"""
         result = SimpleInput(raw=line, line_number=line_number)
 
-        # Remove ! and split by whitespace
-        content = line[1:].strip()
-        tokens = content.split()
-
-        for token in tokens:
-            token_upper = token.upper()
-
-            if token_upper in self.dft_functionals:
-                result.methods.append(token)
-            elif token_upper in self.wavefunction_methods:
-                result.methods.append(token)
-            elif token_upper in self.basis_sets:
-                result.basis_sets.append(token)
-            elif token_upper in self.job_types:
-                result.job_types.append(token)
+        # Remove ! and split by whitespace (split() drops the outer
+        # whitespace itself); each token costs one upper() and one lookup
+        token_table = self._token_table
+        for token in line[1:].split():
+            entry = token_table.get(token.upper())
+            if entry is None:
+                result.other_keywords.append(token)
             else:
-                # Check case-insensitively for some keywords
-                if token_upper in [k.upper() for k in self.all_methods]:
-                    # Find the correct case version
-                    for method in self.all_methods:  # pragma: no branch (always breaks)
-                        if method.upper() == token_upper:
-                            result.methods.append(method)
-                            break
-                elif token_upper in [k.upper() for k in self.basis_sets]:
-                    for basis in self.basis_sets:  # pragma: no branch (always breaks)
-                        if basis.upper() == token_upper:
-                            result.basis_sets.append(basis)
-                            break
-                else:
-                    result.other_keywords.append(token)
+                attr, canonical = entry
+                getattr(result, attr).append(canonical)
 
         return result
 
     def parse_percent_block(
-        self, lines: List[str], start_line: int
+        self,
+        lines: List[str],
+        start_line: int,
+        stripped_lines: Optional[List[str]] = None,
     ) -> Tuple[Optional[PercentBlock], int]:
-        """Parse a % block starting at start_line"""
+        """Parse a % block starting at start_line
+
+        ``stripped_lines`` may hold ``lines`` already stripped of surrounding
+        whitespace (as produced by ``parse``) to avoid stripping them again.
+        """
+        if stripped_lines is None:
+            stripped_lines = [line.strip() for line in lines]
+
         block = PercentBlock(line_start=start_line)
 
-        first_line = lines[start_line].strip()
+        first_line = stripped_lines[start_line]
 
         # Extract block name
-        match = re.match(r"%\s*(\w+)", first_line)
+        match = _BLOCK_NAME_RE.match(first_line)
         if match:
             block.name = match.group(1).lower()
         else:
             return None, start_line
 
         # Check if block contains 'end' on the same line
-        if " end" in first_line.lower() or first_line.lower().endswith("end"):
+        if _INLINE_END_RE.search(first_line):
             block.raw_content = first_line
             block.line_end = start_line
             # Parse parameters from single line
@@ -212,11 +434,12 @@ class ORCAParser:
         i = start_line + 1
 
         while i < len(lines):
-            line = lines[i]
-            content_lines.append(line)
+            content_lines.append(lines[i])
 
-            stripped = line.strip().lower()
-            if stripped == "end" or stripped.endswith(" end"):
+            # Only the last four characters can hold the terminator, so
+            # lower-case that slice rather than the whole line
+            tail = stripped_lines[i][-4:].lower()
+            if tail == "end" or tail == " end":
                 block.line_end = i
                 break
             i += 1
@@ -234,112 +457,73 @@ class ORCAParser:
 
     def _parse_block_parameters(self, block: PercentBlock, content: str) -> None:
         """Parse parameters for a % block"""
-        lines = content.split("\n")
-
-        if block.name == "maxcore":
-            # %maxcore 4000
-            for line in lines:
-                parts = line.split()
-                if len(parts) >= 2 and parts[0].lower() == "%maxcore":
-                    try:
-                        block.parameters["memory"] = int(parts[1])
-                    except ValueError:
-                        pass
-
-        elif block.name == "pal":
-            # %pal nprocs 4 end
-            for line in lines:
-                if "nprocs" in line.lower():
-                    match = re.search(r"nprocs\s+(\d+)", line, re.IGNORECASE)
-                    if match:
-                        block.parameters["nprocs"] = int(match.group(1))
-
-        elif block.name == "method":
-            # Parse method block
-            for line in lines:
-                stripped = line.strip().lower()
-                if "d3bj" in stripped:
-                    block.parameters["dispersion"] = "D3BJ"
-                elif "d3" in stripped:
-                    block.parameters["dispersion"] = "D3"
-                elif "d4" in stripped:
-                    block.parameters["dispersion"] = "D4"
-
-        elif block.name == "scf":
-            # %scf settings
-            for line in lines:
-                stripped = line.strip().lower()
-                if "maxiter" in stripped:
-                    match = re.search(r"maxiter\s+(\d+)", stripped)
-                    if match:
-                        block.parameters["maxiter"] = int(match.group(1))
-
-        elif block.name == "eprnmr":
-            # %eprnmr settings
-            for line in lines:
-                stripped = line.strip().lower()
-                if "gtensor" in stripped:
-                    match = re.search(r"gtensor\s+(\d+)", stripped)
-                    if match:
-                        block.parameters["gtensor"] = int(match.group(1))
-
-        elif block.name == "rirpa":
-            # %rirpa settings
-            for line in lines:
-                stripped = line.strip().lower()
-                if "nroots" in stripped:
-                    match = re.search(r"nroots\s+(\d+)", stripped)
-                    if match:
-                        block.parameters["nroots"] = int(match.group(1))
-
-    def parse_geometry(self, lines: List[str], start_line: int) -> Tuple[Optional[Geometry], int]:
-        """Parse geometry section (* xyz ... *)"""
+        handler = _BLOCK_PARSERS.get(block.name)
+        if handler is not None:
+            handler(block, content.split("\n"))
+
+    def parse_geometry(
+        self,
+        lines: List[str],
+        start_line: int,
+        stripped_lines: Optional[List[str]] = None,
+    ) -> Tuple[Optional[Geometry], int]:
+        """Parse geometry section (* xyz ... *)
+
+        ``stripped_lines`` has the same meaning as in ``parse_percent_block``.
+        """
+        if stripped_lines is None:
+            stripped_lines = [line.strip() for line in lines]
+
         geom = Geometry(line_start=start_line)
 
-        first_line = lines[start_line].strip()
+        first_line = stripped_lines[start_line]
 
         # Parse header: * xyz charge multiplicity
         # or * int charge multiplicity for internal coordinates
-        parts = first_line.split()
-
-        if len(parts) < 2:
+        header = _GEOM_HEADER_RE.match(first_line)
+        if header is None:
             return None, start_line
 
-        # Check format type
-        geom.format_type = parts[1].lower() if len(parts) > 1 else "xyz"
-
-        # Parse charge and multiplicity
-        if len(parts) >= 4:
-            try:
-                geom.charge = int(parts[2])
-                geom.multiplicity = int(parts[3])
-            except ValueError:
-                pass
-
-        # Parse atom lines
+        geom.format_type = header.group("fmt").lower()
+        if header.group("charge") is not None:
+            geom.charge = int(header.group("charge"))
+            geom.multiplicity = int(header.group("mult"))
+        elif first_line[header.end() :].strip():
+            geom.invalid_header = True
+
+        # Parse atom lines. Hot loop for large geometries: bind lookups locally.
+        symbols = _ELEMENT_SYMBOLS
+        append_atom = geom.atoms.append
+        append_invalid = geom.invalid_atoms.append
+        n_lines = len(lines)
         i = start_line + 1
-        while i < len(lines):
-            line = lines[i].strip()
+        while i < n_lines:
+            line = stripped_lines[i]
 
             # End of geometry
             if line == "*":
                 geom.line_end = i
                 break
 
-            # Parse atom
-            atom_parts = line.split()
+            # Parse atom; only the symbol and three coordinates matter, so
+            # leave any trailing columns unsplit
+            atom_parts = line.split(None, 4)
             if len(atom_parts) >= 4:
+                # Element symbols are case-insensitive in ORCA; the lookup both
+                # normalizes the symbol and tells us whether it is valid
+                symbol = atom_parts[0]
+                element = symbols.get(symbol.upper())
                 try:
-                    atom = Atom(
-                        element=atom_parts[0],
-                        x=float(atom_parts[1]),
-                        y=float(atom_parts[2]),
-                        z=float(atom_parts[3]),
-                        line_number=i,
-                    )
-                    geom.atoms.append(atom)
+                    x = float(atom_parts[1])
+                    y = float(atom_parts[2])
+                    z = float(atom_parts[3])
                 except ValueError:
                     pass
+                else:
+                    atom = Atom(symbol if element is None else element, x, y, z, i)
+                    append_atom(atom)
+                    if element is None:
+                        append_invalid(atom)
 
             i += 1
 
@@ -347,72 +531,37 @@ class ORCAParser:
 
     def _run_diagnostics(self, result: ParseResult) -> None:
         """Run diagnostics and populate errors/warnings"""
+        errors = result.errors
+
         # Check for simple input
         if result.simple_input is None:
-            result.errors.append(
-                {
-                    "message": "Missing simple input line (!) with method and basis set",
-                    "line": 0,
-                    "severity": "error",
-                }
-            )
+            errors.append(_error(DiagCode.MISSING_SIMPLE_INPUT))
         else:
+            line_number = result.simple_input.line_number
+
             # Check for method
             if not result.simple_input.methods:
-                result.errors.append(
-                    {
-                        "message": "No method specified in simple input (e.g., B3LYP, HF, MP2)",
-                        "line": (
-                            result.simple_input.line_number
-                            if hasattr(result.simple_input, "line_number")
-                            else 0
-                        ),
-                        "severity": "error",
-                    }
-                )
+                errors.append(_error(DiagCode.MISSING_METHOD, line_number))
 
             # Check for basis set
             if not result.simple_input.basis_sets:
-                result.errors.append(
-                    {
-                        "message": "No basis set specified in simple input (e.g., def2-TZVP, 6-31G*)",
-                        "line": (
-                            result.simple_input.line_number
-                            if hasattr(result.simple_input, "line_number")
-                            else 0
-                        ),
-                        "severity": "error",
-                    }
-                )
+                errors.append(_error(DiagCode.MISSING_BASIS, line_number))
 
         # Check for geometry
         if result.geometry is None:
-            result.errors.append(
-                {
-                    "message": "Missing geometry section (* xyz charge multiplicity ...)",
-                    "line": 0,
-                    "severity": "error",
-                }
-            )
+            errors.append(_error(DiagCode.MISSING_GEOMETRY))
         else:
-            # Validate atoms
-            for atom in result.geometry.atoms:
-                if not atom.is_valid():
-                    result.errors.append(
-                        {
-                            "message": f"Invalid element symbol: {atom.element}",
-                            "line": atom.line_number,
-                            "severity": "error",
-                        }
-                    )
-
-        # Check for maxcore recommendation
-        has_maxcore = any(b.name == "maxcore" for b in result.percent_blocks)
-        if not has_maxcore:
+            if result.geometry.invalid_header:
+                errors.append(_error(DiagCode.INVALID_GEOMETRY_HEADER, result.geometry.line_start))
+            # Invalid atoms were already classified while parsing the geometry
+            for atom in result.geometry.invalid_atoms:
+                errors.append(
+                    _error(DiagCode.INVALID_ELEMENT, atom.line_number, element=atom.element)
+                )
+
+        # Check for maxcore recommendation, sized to the molecule
+        if "maxcore" not in result.percent_blocks_by_name:
+            n_atoms = len(result.geometry.atoms) if result.geometry else 0
             result.warnings.append(
-                {
-                    "message": "Missing %maxcore setting. Recommended: %maxcore 2000-4000 (MB per core)",
-                    "line": 0,
-                    "severity": "warning",
-                }
+                _warning(DiagCode.MISSING_MAXCORE, maxcore=recommend_maxcore(n_atoms))
             )
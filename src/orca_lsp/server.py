@@ -1,13 +1,16 @@
 """ORCA Language Server Protocol implementation"""
 
+import asyncio
 import re
-from typing import TYPE_CHECKING, List, Optional
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from pygls.server import LanguageServer
 from lsprotocol.types import (
     CompletionItem,
     CompletionItemKind,
     CompletionList,
+    CompletionOptions,
     CompletionParams,
     Diagnostic,
     DiagnosticSeverity,
@@ -29,16 +32,220 @@ from lsprotocol.types import (
 if TYPE_CHECKING:
     from pygls.workspace import TextDocument
 
-from .parser import ORCAParser
+from .parser import DiagCode, ORCAParser, ParseResult
 from .keywords import (
     DFT_FUNCTIONALS,
     WAVEFUNCTION_METHODS,
     BASIS_SETS,
     JOB_TYPES,
     PERCENT_BLOCKS,
-    ELEMENTS,
+    ELEMENTS_SORTED,
+    recommend_maxcore,
 )
 
+# Patterns used on every completion request
+_PERCENT_BLOCK_RE = re.compile(r"%\s*(\w*)$")
+_PERCENT_NAME_RE = re.compile(r"%\s*(\w+)")
+_GEOM_LINE_RE = re.compile(r"^[A-Z][a-z]?\s+[-\d\.]")
+# A keyword under the cursor: alphanumerics plus the punctuation that occurs
+# inside ORCA keywords, so def2-TZVP, 6-31G* and RI_J are single words
+_WORD_RE = re.compile(r"[\w\-*()]+")
+
+# The line boundaries str.splitlines() (and so TextDocument.lines) breaks on
+_LINE_BREAK_RE = re.compile("\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# Seconds to wait after the last didChange before re-validating
+_DEBOUNCE_DELAY = 0.15
+
+# What identifies a published diagnostic: line, message, severity
+_DiagnosticKey = Tuple[int, str, Optional[DiagnosticSeverity]]
+
+# Source set on our diagnostics; code actions also receive other servers' ones
+_DIAGNOSTIC_SOURCE = "orca-lsp"
+
+# Number of documents whose line offsets, validated source and last
+# published diagnostics are kept
+_PARSE_RESULTS_SIZE = 32
+
+# Completion item kinds, bound once instead of looked up per item
+_KIND_FUNC = CompletionItemKind.Function
+_KIND_METHOD = CompletionItemKind.Method
+_KIND_CLASS = CompletionItemKind.Class
+_KIND_EVENT = CompletionItemKind.Event
+_KIND_ENUM = CompletionItemKind.EnumMember
+_KIND_KW = CompletionItemKind.Keyword
+_KIND_VAL = CompletionItemKind.Value
+_KIND_PROP = CompletionItemKind.Property
+
+# Parameter completions offered inside specific % blocks
+_BLOCK_COMPLETIONS: Dict[str, Tuple[CompletionItem, ...]] = {
+    "maxcore": tuple(
+        CompletionItem(label=f"{mem} MB", kind=_KIND_VAL, insert_text=mem)
+        for mem in ("1000", "2000", "4000", "8000", "16000")
+    ),
+    "pal": (CompletionItem(label="nprocs", kind=_KIND_PROP, insert_text="nprocs "),),
+    "method": tuple(
+        CompletionItem(label=disp, kind=_KIND_VAL, insert_text=disp)
+        for disp in ("D3", "D3BJ", "D4")
+    ),
+    "scf": tuple(
+        CompletionItem(label=opt, kind=_KIND_PROP, insert_text=f"{opt} ")
+        for opt in ("maxiter", "convergence", "NRMaxIt")
+    ),
+}
+
+
+def _build_percent_name_completions() -> List[CompletionItem]:
+    """Build % block name completions"""
+    completions: List[CompletionItem] = []
+
+    for name, info in PERCENT_BLOCKS.items():
+        completions.append(
+            CompletionItem(
+                label=name,
+                kind=_KIND_KW,
+                detail=info.get("description", ""),
+                insert_text=f"{name} ",
+                data={"table": "block", "name": name},
+            )
+        )
+
+    return completions
+
+
+def _build_method_completions() -> List[CompletionItem]:
+    """Build method completions"""
+    completions: List[CompletionItem] = []
+
+    # DFT functionals
+    for name, info in DFT_FUNCTIONALS.items():
+        completions.append(
+            CompletionItem(
+                label=name,
+                kind=_KIND_FUNC,
+                detail=f"DFT: {info.get('type', '')}",
+                data={"table": "dft", "name": name},
+            )
+        )
+
+    # Wavefunction methods
+    for name, info in WAVEFUNCTION_METHODS.items():
+        completions.append(
+            CompletionItem(
+                label=name,
+                kind=_KIND_METHOD,
+                detail="Wavefunction method",
+                data={"table": "wf", "name": name},
+            )
+        )
+
+    return completions
+
+
+def _build_basis_completions() -> List[CompletionItem]:
+    """Build basis set completions"""
+    completions: List[CompletionItem] = []
+
+    for name, info in BASIS_SETS.items():
+        completions.append(
+            CompletionItem(
+                label=name,
+                kind=_KIND_CLASS,
+                detail=info.get("type", ""),
+                data={"table": "basis", "name": name},
+            )
+        )
+
+    return completions
+
+
+def _build_job_completions() -> List[CompletionItem]:
+    """Build job type completions"""
+    completions: List[CompletionItem] = []
+
+    for name, info in JOB_TYPES.items():
+        completions.append(
+            CompletionItem(
+                label=name,
+                kind=_KIND_EVENT,
+                detail="Job type",
+                data={"table": "job", "name": name},
+            )
+        )
+
+    return completions
+
+
+def _build_element_completions() -> List[CompletionItem]:
+    """Build element symbol completions for geometry"""
+    completions: List[CompletionItem] = []
+
+    for element in ELEMENTS_SORTED:
+        completions.append(
+            CompletionItem(
+                label=element,
+                kind=_KIND_ENUM,
+                detail=f"Element {element}",
+            )
+        )
+
+    return completions
+
+
+def _build_hover_index() -> Dict[str, Hover]:
+    """Map upper-case keywords to their ready-made hover responses
+
+    Earlier tables take precedence: functionals, wavefunction methods,
+    basis sets, then job types.
+    """
+    index: Dict[str, str] = {}
+
+    for name, info in DFT_FUNCTIONALS.items():
+        index.setdefault(
+            name.upper(),
+            f"**{name}**\n\n{info.get('description', '')}\n\nType: {info.get('type', 'N/A')}",
+        )
+
+    for name, info in WAVEFUNCTION_METHODS.items():
+        index.setdefault(name.upper(), f"**{name}**\n\n{info.get('description', '')}")
+
+    for name, info in BASIS_SETS.items():
+        index.setdefault(
+            name.upper(),
+            f"**{name}**\n\n{info.get('description', '')}\n\nType: {info.get('type', 'N/A')}",
+        )
+
+    for name, info in JOB_TYPES.items():
+        index.setdefault(name.upper(), f"**{name}**\n\n{info.get('description', '')}")
+
+    return {
+        key: Hover(contents=MarkupContent(kind=MarkupKind.Markdown, value=value))
+        for key, value in index.items()
+    }
+
+
+# Keyword tables behind each completion item's "table" data tag. Items are
+# sent without documentation, which is filled in on completionItem/resolve
+# for the one item the client actually shows.
+_DOC_TABLES: Dict[str, Dict[str, Dict[str, str]]] = {
+    "block": PERCENT_BLOCKS,
+    "dft": DFT_FUNCTIONALS,
+    "wf": WAVEFUNCTION_METHODS,
+    "basis": BASIS_SETS,
+    "job": JOB_TYPES,
+}
+
+# Completion items only depend on the static keyword tables, so they are
+# built once at import and shared by every request and server instance
+_PERCENT_NAME_COMPLETIONS = _build_percent_name_completions()
+_METHOD_COMPLETIONS = _build_method_completions()
+_BASIS_COMPLETIONS = _build_basis_completions()
+_JOB_COMPLETIONS = _build_job_completions()
+_ELEMENT_COMPLETIONS = _build_element_completions()
+
+# Case-insensitive keyword -> Hover, one dict lookup per hover request
+_HOVER_INDEX = _build_hover_index()
+
 
 class ORCALanguageServer(LanguageServer):
     """ORCA Language Server"""
@@ -46,15 +253,39 @@ class ORCALanguageServer(LanguageServer):
     def __init__(self) -> None:
         super().__init__("orca-lsp", "0.5.4")
         self.parser = ORCAParser()
+
+        self._reset_document_state()
         self._setup_features()
 
+    def _reset_document_state(self) -> None:
+        """Start with no per-document caches or pending validations"""
+        # Pending debounced validation per document URI
+        self._pending: Dict[str, "asyncio.Task[None]"] = {}
+
+        # What was last published per URI, to skip no-op re-publishes. Kept until
+        # the document is reopened or drops out of the newest _PARSE_RESULTS_SIZE;
+        # an evicted document is simply published again
+        self._last_published: "OrderedDict[str, Tuple[_DiagnosticKey, ...]]" = OrderedDict()
+
+        # Start offset of every line of the last validated source, per URI
+        self._line_offsets: "OrderedDict[str, Tuple[str, List[int]]]" = OrderedDict()
+
+        # Source whose diagnostics were last published, per URI
+        self._validated: "OrderedDict[str, str]" = OrderedDict()
+
     def _setup_features(self) -> None:
         """Setup LSP features"""
 
-        @self.feature("textDocument/completion")
+        # Documentation is filled in by completionItem/resolve, which clients
+        # only send when the server advertises it
+        @self.feature("textDocument/completion", CompletionOptions(resolve_provider=True))
         def on_completion(params: CompletionParams) -> Optional[CompletionList]:
             return self._on_completion(params)  # pragma: no cover
 
+        @self.feature("completionItem/resolve")
+        def on_completion_item_resolve(item: CompletionItem) -> CompletionItem:
+            return self._on_completion_item_resolve(item)  # pragma: no cover
+
         @self.feature("textDocument/hover")
         def on_hover(params: HoverParams) -> Optional[Hover]:
             return self._on_hover(params)  # pragma: no cover
@@ -74,184 +305,97 @@ class ORCALanguageServer(LanguageServer):
     def _on_completion(self, params: CompletionParams) -> Optional[CompletionList]:
         """Handle completion requests"""
         document = self.workspace.get_text_document(params.text_document.uri)
-        line = document.lines[params.position.line]
+        line = self._get_line(document, params.position.line)
 
         # Determine context
         completions = self._get_completions(line, params.position)
+        if not completions:
+            # Nothing applies here; a null result saves sending an empty list
+            return None
 
         return CompletionList(is_incomplete=False, items=completions)
 
+    def _on_completion_item_resolve(self, item: CompletionItem) -> CompletionItem:
+        """Fill in the documentation of the completion item being shown"""
+        data = item.data
+        if not isinstance(data, dict):
+            return item
+
+        info = _DOC_TABLES.get(data.get("table", ""), {}).get(data.get("name", ""))
+        if info is None:
+            return item
+
+        if data["table"] == "block":
+            item.documentation = f"Example: {info.get('example', '')}"
+        else:
+            item.documentation = info.get("description", "")
+
+        return item
+
     def _get_completions(self, line: str, position: Position) -> List[CompletionItem]:
         """Get completions based on context"""
-        completions: List[CompletionItem] = []
-
-        stripped = line[: position.character].strip()
+        # Dispatch on the first non-space character before the cursor
+        stripped = line[: position.character].lstrip()
+        lead = stripped[:1]
 
         # % block completion
-        if stripped.startswith("%"):
-            completions.extend(self._get_percent_completions(stripped))
+        if lead == "%":
+            return self._get_percent_completions(stripped.rstrip())
 
         # Simple input line completion
-        elif stripped.startswith("!"):
-            completions.extend(self._get_method_completions())
-            completions.extend(self._get_basis_completions())
-            completions.extend(self._get_job_completions())
+        if lead == "!":
+            return (
+                self._get_method_completions()
+                + self._get_basis_completions()
+                + self._get_job_completions()
+            )
 
         # Geometry section - element completion
-        elif self._in_geometry_section(line):
-            completions.extend(self._get_element_completions())
+        if self._in_geometry_section(line):
+            return list(self._get_element_completions())
 
-        return completions
+        return []
 
     def _get_percent_completions(self, line: str) -> List[CompletionItem]:
         """Get % block completions"""
         completions: List[CompletionItem] = []
 
         # Check if we're completing the block name
-        match = re.match(r"%\s*(\w*)$", line)
+        match = _PERCENT_BLOCK_RE.match(line)
         if match:
-            for name, info in PERCENT_BLOCKS.items():
-                completions.append(
-                    CompletionItem(
-                        label=name,
-                        kind=CompletionItemKind.Keyword,
-                        detail=info.get("description", ""),
-                        documentation=f"Example: {info.get('example', '')}",
-                        insert_text=f"{name} ",
-                    )
-                )
+            completions.extend(_PERCENT_NAME_COMPLETIONS)
 
         # Check if we're in a specific block
-        for name in PERCENT_BLOCKS.keys():
-            if f"%{name}" in line.lower():
-                completions.extend(self._get_block_specific_completions(name))
+        match = _PERCENT_NAME_RE.match(line)
+        if match:
+            completions.extend(self._get_block_specific_completions(match.group(1).lower()))
 
         return completions
 
-    def _get_block_specific_completions(self, block_name: str) -> List[CompletionItem]:
-        """Get completions for specific % block parameters"""
-        completions: List[CompletionItem] = []
-
-        if block_name == "maxcore":
-            for mem in ["1000", "2000", "4000", "8000", "16000"]:
-                completions.append(
-                    CompletionItem(
-                        label=f"{mem} MB",
-                        kind=CompletionItemKind.Value,
-                        insert_text=mem,
-                    )
-                )
-
-        elif block_name == "pal":
-            completions.append(
-                CompletionItem(
-                    label="nprocs",
-                    kind=CompletionItemKind.Property,
-                    insert_text="nprocs ",
-                )
-            )
-
-        elif block_name == "method":
-            for disp in ["D3", "D3BJ", "D4"]:
-                completions.append(
-                    CompletionItem(
-                        label=disp,
-                        kind=CompletionItemKind.Value,
-                        insert_text=disp,
-                    )
-                )
-
-        elif block_name == "scf":
-            for opt in ["maxiter", "convergence", "NRMaxIt"]:
-                completions.append(
-                    CompletionItem(
-                        label=opt,
-                        kind=CompletionItemKind.Property,
-                        insert_text=f"{opt} ",
-                    )
-                )
-
-        return completions
+    def _get_block_specific_completions(self, block_name: str) -> Tuple[CompletionItem, ...]:
+        """Get completions for specific % block parameters (shared, do not mutate)"""
+        return _BLOCK_COMPLETIONS.get(block_name, ())
 
     def _get_method_completions(self) -> List[CompletionItem]:
         """Get method completions"""
-        completions: List[CompletionItem] = []
-
-        # DFT functionals
-        for name, info in DFT_FUNCTIONALS.items():
-            completions.append(
-                CompletionItem(
-                    label=name,
-                    kind=CompletionItemKind.Function,
-                    detail=f"DFT: {info.get('type', '')}",
-                    documentation=info.get("description", ""),
-                )
-            )
-
-        # Wavefunction methods
-        for name, info in WAVEFUNCTION_METHODS.items():
-            completions.append(
-                CompletionItem(
-                    label=name,
-                    kind=CompletionItemKind.Method,
-                    detail="Wavefunction method",
-                    documentation=info.get("description", ""),
-                )
-            )
-
-        return completions
+        return _METHOD_COMPLETIONS
 
     def _get_basis_completions(self) -> List[CompletionItem]:
         """Get basis set completions"""
-        completions: List[CompletionItem] = []
-
-        for name, info in BASIS_SETS.items():
-            completions.append(
-                CompletionItem(
-                    label=name,
-                    kind=CompletionItemKind.Class,
-                    detail=info.get("type", ""),
-                    documentation=info.get("description", ""),
-                )
-            )
-
-        return completions
+        return _BASIS_COMPLETIONS
 
     def _get_job_completions(self) -> List[CompletionItem]:
         """Get job type completions"""
-        completions: List[CompletionItem] = []
-
-        for name, info in JOB_TYPES.items():
-            completions.append(
-                CompletionItem(
-                    label=name,
-                    kind=CompletionItemKind.Event,
-                    detail="Job type",
-                    documentation=info.get("description", ""),
-                )
-            )
-
-        return completions
+        return _JOB_COMPLETIONS
 
     def _get_element_completions(self) -> List[CompletionItem]:
         """Get element symbol completions for geometry"""
-        completions: List[CompletionItem] = []
-
-        for element in sorted(ELEMENTS):
-            completions.append(
-                CompletionItem(
-                    label=element,
-                    kind=CompletionItemKind.EnumMember,
-                    detail=f"Element {element}",
-                )
-            )
-
-        return completions
+        return _ELEMENT_COMPLETIONS
 
     def _in_geometry_section(self, line: str) -> bool:
         """Check if we're in a geometry section"""
         # This is a simplified check
-        return bool(re.match(r"^[A-Z][a-z]?\s+[-\d\.]", line.strip()))
+        return bool(_GEOM_LINE_RE.match(line.strip()))
 
     def _on_hover(self, params: HoverParams) -> Optional[Hover]:
         """Handle hover requests"""
@@ -264,115 +408,153 @@ class ORCALanguageServer(LanguageServer):
             return None
 
         # Look up documentation
-        word_upper = word.upper()
-
-        # Check methods
-        if word_upper in DFT_FUNCTIONALS:
-            info = DFT_FUNCTIONALS[word_upper]
-            return Hover(
-                contents=MarkupContent(
-                    kind=MarkupKind.Markdown,
-                    value=f"**{word}**\n\n{info.get('description', '')}\n\nType: {info.get('type', 'N/A')}",
-                )
-            )
+        return _HOVER_INDEX.get(word.upper())
 
-        if word_upper in WAVEFUNCTION_METHODS:
-            info = WAVEFUNCTION_METHODS[word_upper]
-            return Hover(
-                contents=MarkupContent(
-                    kind=MarkupKind.Markdown, value=f"**{word}**\n\n{info.get('description', '')}"
-                )
-            )
+    def _get_line(self, document: "TextDocument", line: int) -> str:
+        """Get one line of a document without splitting the whole source
 
-        # Check basis sets
-        if word_upper in BASIS_SETS:
-            info = BASIS_SETS[
-                word_upper
-            ]  # pragma: no cover (hard to test due to hyphen in basis set names)
-            return Hover(
-                contents=MarkupContent(  # pragma: no cover (hard to test due to hyphen in basis set names)
-                    kind=MarkupKind.Markdown,
-                    value=f"**{word}**\n\n{info.get('description', '')}\n\nType: {info.get('type', 'N/A')}",
-                )
-            )
+        Uses the offsets recorded when the document was last validated, as
+        long as its source has not been replaced since.
+        """
+        indexed = self._line_offsets.get(document.uri)
+        if indexed is None or indexed[0] is not document.source:
+            return document.lines[line]
 
-        # Check job types
-        if word_upper in JOB_TYPES:
-            info = JOB_TYPES[word_upper]
-            return Hover(
-                contents=MarkupContent(
-                    kind=MarkupKind.Markdown, value=f"**{word}**\n\n{info.get('description', '')}"
-                )
-            )
+        content, offsets = indexed
+        end = offsets[line + 1] if line + 1 < len(offsets) else len(content)
+        return content[offsets[line] : end]
+
+    def _index_lines(self, uri: str, content: str) -> None:
+        """Record the line start offsets of ``content`` for ``uri``"""
+        offsets = [0]
+        offsets.extend(match.end() for match in _LINE_BREAK_RE.finditer(content))
 
-        return None
+        self._line_offsets[uri] = (content, offsets)
+        self._line_offsets.move_to_end(uri)
+        if len(self._line_offsets) > _PARSE_RESULTS_SIZE:
+            self._line_offsets.popitem(last=False)
 
     def _get_word_at_position(self, document: "TextDocument", position: Position) -> str:
         """Get the word at the given position"""
-        line = document.lines[position.line]
+        line = self._get_line(document, position.line)
 
-        # Find word boundaries
-        start = position.character
-        while start > 0 and line[start - 1].isalnum():
-            start -= 1
+        # Find the word whose span touches the cursor
+        character = position.character
+        for match in _WORD_RE.finditer(line):
+            if match.start() > character:
+                break
+            if character <= match.end():
+                return match.group()
 
-        end = position.character
-        while end < len(line) and line[end].isalnum():
-            end += 1
-
-        return str(line[start:end])
+        return ""
 
     def _validate_document(self, uri: str) -> None:
         """Validate a document and publish diagnostics"""
         document = self.workspace.get_text_document(uri)
         content = document.source
+        if self._validated.get(uri) == content:
+            # Edits that round-trip to the same text need no new diagnostics
+            return
+
+        # Parse the document (identical content reuses the previous result)
+        result = self.parser.parse_cached(content)
+
+        self._index_lines(uri, content)
 
-        # Parse the document
-        result = self.parser.parse(content)
+        # Publish diagnostics
+        self._publish(uri, self._to_diagnostics(result))
+        self._remember_validated(uri, content)
 
-        # Convert to LSP diagnostics
+    async def _validate_document_async(self, uri: str) -> None:
+        """Validate a document, parsing it off the event loop thread"""
+        document = self.workspace.get_text_document(uri)
+        content = document.source
+        if self._validated.get(uri) == content:
+            return
+
+        result = await asyncio.to_thread(self.parser.parse_cached, content)
+
+        self._index_lines(uri, content)
+
+        # Let requests that queued up during the parse be answered before
+        # the diagnostics are encoded; a change arriving meanwhile cancels
+        # this task, so stale results are never sent. Publishing stays on
+        # the loop thread because the JSON-RPC writer is not thread-safe.
+        await asyncio.sleep(0)
+        self._publish(uri, self._to_diagnostics(result))
+        self._remember_validated(uri, content)
+
+    def _remember_validated(self, uri: str, content: str) -> None:
+        """Record that diagnostics for ``content`` were published, evicting the oldest"""
+        self._validated[uri] = content
+        self._validated.move_to_end(uri)
+        if len(self._validated) > _PARSE_RESULTS_SIZE:
+            self._validated.popitem(last=False)
+
+    def _to_diagnostics(self, result: ParseResult) -> List[Diagnostic]:
+        """Convert parser errors and warnings to LSP diagnostics"""
         diagnostics: List[Diagnostic] = []
 
-        for error in result.errors:
-            diagnostics.append(
-                Diagnostic(
-                    range=Range(
-                        start=Position(line=error.get("line", 0), character=0),
-                        end=Position(line=error.get("line", 0), character=100),
-                    ),
-                    message=error.get("message", ""),
-                    severity=DiagnosticSeverity.Error,
-                    source="orca-lsp",
-                )
-            )
+        # Diagnostics on the same line share one whole-line Range
+        ranges: Dict[int, Range] = {}
+
+        for items, severity in (
+            (result.errors, DiagnosticSeverity.Error),
+            (result.warnings, DiagnosticSeverity.Warning),
+        ):
+            for item in items:
+                line = item.get("line", 0)
+                code = item.get("code")
+                line_range = ranges.get(line)
+                if line_range is None:
+                    line_range = ranges[line] = Range(
+                        start=Position(line=line, character=0),
+                        end=Position(line=line, character=100),
+                    )
 
-        for warning in result.warnings:
-            diagnostics.append(
-                Diagnostic(
-                    range=Range(
-                        start=Position(line=warning.get("line", 0), character=0),
-                        end=Position(line=warning.get("line", 0), character=100),
-                    ),
-                    message=warning.get("message", ""),
-                    severity=DiagnosticSeverity.Warning,
-                    source="orca-lsp",
+                diagnostics.append(
+                    Diagnostic(
+                        range=line_range,
+                        message=item.get("message", ""),
+                        severity=severity,
+                        code=None if code is None else int(code),
+                        source=_DIAGNOSTIC_SOURCE,
+                    )
                 )
-            )
 
-        # Publish diagnostics
-        self.publish_diagnostics(uri, diagnostics)
+        return diagnostics
+
+    def _publish(self, uri: str, diagnostics: List[Diagnostic]) -> None:
+        """Publish diagnostics unless the client already has the same set"""
+        key = tuple((d.range.start.line, d.message, d.severity) for d in diagnostics)
+        unchanged = self._last_published.get(uri) == key
+        self._last_published[uri] = key
+        self._last_published.move_to_end(uri)
+        if len(self._last_published) > _PARSE_RESULTS_SIZE:
+            self._last_published.popitem(last=False)
+
+        if not unchanged:
+            self.publish_diagnostics(uri, diagnostics)
 
     def _on_code_action(self, params: CodeActionParams) -> List[CodeAction]:
         """Handle code action requests"""
         actions: List[CodeAction] = []
-        self.workspace.get_text_document(params.text_document.uri)
+        document = self.workspace.get_text_document(params.text_document.uri)
 
         # Get diagnostics at this range
         for diagnostic in params.context.diagnostics:
             # Add maxcore quick fix
-            if "Missing %maxcore" in diagnostic.message:
+            # Match on our own code (other servers' codes may collide), or on
+            # the message for clients that drop codes
+            if (
+                diagnostic.source == _DIAGNOSTIC_SOURCE
+                and diagnostic.code == DiagCode.MISSING_MAXCORE
+            ) or "Missing %maxcore" in diagnostic.message:
+                # Size the setting to the molecule; an unchanged source is a cache hit
+                geometry = self.parser.parse_cached(document.source).geometry
+                maxcore = recommend_maxcore(len(geometry.atoms) if geometry else 0)
                 action = CodeAction(
-                    title="Add %maxcore 4000",
+                    title=f"Add %maxcore {maxcore}",
                     kind=CodeActionKind.QuickFix,
                     edit=WorkspaceEdit(
                         changes={
@@ -382,7 +564,7 @@ class ORCALanguageServer(LanguageServer):
                                         start=Position(line=1, character=0),
                                         end=Position(line=1, character=0),
                                     ),
-                                    new_text="%maxcore 4000\n",
+                                    new_text=f"%maxcore {maxcore}\n",
                                 )
                             ]
                         }
@@ -394,15 +576,62 @@ class ORCALanguageServer(LanguageServer):
 
     def _on_did_open(self, params: DidOpenTextDocumentParams) -> None:
         """Handle document open"""
-        self._validate_document(params.text_document.uri)
+        # A freshly opened document shows no diagnostics in the client yet
+        self._last_published.pop(params.text_document.uri, None)
+        self._validated.pop(params.text_document.uri, None)
+        self._schedule_validation(params.text_document.uri, delay=0)
 
     def _on_did_change(self, params: DidChangeTextDocumentParams) -> None:
         """Handle document change"""
-        self._validate_document(params.text_document.uri)
+        # The recorded line offsets describe the previous source
+        self._line_offsets.pop(params.text_document.uri, None)
+        self._schedule_validation(params.text_document.uri)
+
+    def _schedule_validation(self, uri: str, delay: Optional[float] = None) -> None:
+        """Validate a document once edits pause
+
+        Each call supersedes the validation still pending for the same URI,
+        so a burst of keystrokes costs a single parse. ``delay`` defaults to
+        the debounce delay. Without a running event loop the document is
+        validated immediately.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._validate_document(uri)
+            return
+
+        pending = self._pending.pop(uri, None)
+        if pending is not None:
+            pending.cancel()
+
+        if delay is None:
+            delay = _DEBOUNCE_DELAY
+
+        self._pending[uri] = asyncio.ensure_future(self._deferred_validate(uri, delay))
+
+    async def _deferred_validate(self, uri: str, delay: float) -> None:
+        """Wait ``delay`` seconds, then validate the document"""
+        try:
+            await asyncio.sleep(delay)
+            await self._validate_document_async(uri)
+        finally:
+            # A superseding change has already replaced this task
+            if self._pending.get(uri) is asyncio.current_task():
+                del self._pending[uri]
 
 
 def main() -> None:
     """Main entry point"""
+    # The server creates its event loop on construction, so the uvloop
+    # policy has to be in place first
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        uvloop.install()
+
     server = ORCALanguageServer()
     server.start_io()
 
@@ -73,7 +73,7 @@ H 0 0 0
 *
 """
         result = parser.parse(content)
-        pal_block = next((b for b in result.percent_blocks if b.name == "pal"), None)
+        pal_block = result.percent_blocks_by_name.get("pal")
         assert pal_block is not None
         # Should not have nprocs parameter
         assert "nprocs" not in pal_block.parameters
@@ -91,7 +91,7 @@ H 0 0 0
 *
 """
         result = parser.parse(content)
-        scf_block = next((b for b in result.percent_blocks if b.name == "scf"), None)
+        scf_block = result.percent_blocks_by_name.get("scf")
         assert scf_block is not None
         # Should not have maxiter parameter
         assert "maxiter" not in scf_block.parameters
@@ -126,8 +126,8 @@ class TestServerHoverCoverage:
 
             result = server._on_hover(params)
             # Should return hover info for basis set
-            if result is not None:
-                assert "def2-TZVP" in result.contents.value
+            assert result is not None
+            assert "def2-TZVP" in result.contents.value
 
     def test_hover_job_type(self, server):
         """Test hover on job type keyword.
@@ -175,3 +175,49 @@ class TestServerHoverCoverage:
             # Should return hover info for DFT functional
             if result is not None:
                 assert "B3LYP" in result.contents.value
+
+    def test_hover_is_case_insensitive(self, server):
+        """Lower-case keywords hover with their canonical documentation."""
+        mock_doc = MagicMock()
+        mock_doc.lines = ["b3lyp"]
+        mock_doc.source = "b3lyp"
+
+        mock_workspace = MagicMock()
+        mock_workspace.get_text_document.return_value = mock_doc
+
+        with patch.object(
+            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
+        ):
+            params = HoverParams(
+                text_document=TextDocumentIdentifier(uri="file:///test.inp"),
+                position=Position(line=0, character=2),
+            )
+
+            result = server._on_hover(params)
+            assert result is not None
+            assert "**B3LYP**" in result.contents.value
+            assert "Type:" in result.contents.value
+
+    def test_hover_responses_are_prebuilt(self, server):
+        """Repeated hovers on a keyword return the same prebuilt Hover."""
+        mock_doc = MagicMock()
+        mock_doc.lines = ["! MP2 mp2"]
+
+        mock_workspace = MagicMock()
+        mock_workspace.get_text_document.return_value = mock_doc
+
+        with patch.object(
+            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
+        ):
+            upper, lower = (
+                server._on_hover(
+                    HoverParams(
+                        text_document=TextDocumentIdentifier(uri="file:///test.inp"),
+                        position=Position(line=0, character=character),
+                    )
+                )
+                for character in (3, 7)
+            )
+
+        assert upper is not None
+        assert upper is lower
@@ -26,7 +26,7 @@ H 0 0 0
 *
 """
         result = parser.parse(content)
-        pal_block = next((b for b in result.percent_blocks if b.name == "pal"), None)
+        pal_block = result.percent_blocks_by_name.get("pal")
         assert pal_block is not None
         # Should not have nprocs parameter (regex didn't match)
         assert "nprocs" not in pal_block.parameters
@@ -46,7 +46,7 @@ H 0 0 0
 *
 """
         result = parser.parse(content)
-        scf_block = next((b for b in result.percent_blocks if b.name == "scf"), None)
+        scf_block = result.percent_blocks_by_name.get("scf")
         assert scf_block is not None
         # Should not have maxiter parameter (regex didn't match)
         assert "maxiter" not in scf_block.parameters
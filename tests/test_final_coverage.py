@@ -34,7 +34,7 @@ end
 H 0 0 0
 *"""
         result = parser.parse(content)
-        scf_block = next((b for b in result.percent_blocks if b.name == "scf"), None)
+        scf_block = result.percent_blocks_by_name.get("scf")
         if scf_block:
             assert scf_block.parameters.get("maxiter") == 50
 
@@ -98,7 +98,7 @@ H 0 0 0
         """Test parsing %method block on single line."""
         content = "! B3LYP def2-SVP\n%method d3 end\n* xyz 0 1\nH 0 0 0\n*"
         result = parser.parse(content)
-        method_block = next((b for b in result.percent_blocks if b.name == "method"), None)
+        method_block = result.percent_blocks_by_name.get("method")
         if method_block:
             assert "dispersion" in method_block.parameters
 
@@ -106,7 +106,7 @@ H 0 0 0
         """Test parsing %pal block without nprocs."""
         content = "! B3LYP def2-SVP\n%pal end\n* xyz 0 1\nH 0 0 0\n*"
         result = parser.parse(content)
-        pal_block = next((b for b in result.percent_blocks if b.name == "pal"), None)
+        pal_block = result.percent_blocks_by_name.get("pal")
         if pal_block:
             # nprocs should not be set
             assert "nprocs" not in pal_block.parameters
@@ -168,10 +168,10 @@ H 0.75 0.0 0.0
 """
         result = parser.parse(content)
         assert result.simple_input is not None
-        assert any(b.name == "maxcore" for b in result.percent_blocks)
-        assert any(b.name == "pal" for b in result.percent_blocks)
-        assert any(b.name == "scf" for b in result.percent_blocks)
-        assert any(b.name == "method" for b in result.percent_blocks)
+        assert "maxcore" in result.percent_blocks_by_name
+        assert "pal" in result.percent_blocks_by_name
+        assert "scf" in result.percent_blocks_by_name
+        assert "method" in result.percent_blocks_by_name
         assert result.geometry is not None
 
     def test_parse_wavefunction_method_mp2(self, parser):
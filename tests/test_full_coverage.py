@@ -1,6 +1,6 @@
 """Tests for 100% coverage of ORCA LSP server and parser."""
 
-from unittest.mock import MagicMock, PropertyMock, patch
+from unittest.mock import DEFAULT, MagicMock, PropertyMock, patch
 
 import pytest
 from lsprotocol.types import (
@@ -105,33 +105,28 @@ class TestServerCompletions:
     def test_get_block_specific_completions_maxcore(self, server):
         """Test completions for maxcore block."""
         completions = server._get_block_specific_completions("maxcore")
-        assert isinstance(completions, list)
         assert len(completions) > 0
         assert any("MB" in item.label for item in completions)
 
     def test_get_block_specific_completions_pal(self, server):
         """Test completions for pal block."""
         completions = server._get_block_specific_completions("pal")
-        assert isinstance(completions, list)
         assert any("nprocs" in item.label for item in completions)
 
     def test_get_block_specific_completions_method(self, server):
         """Test completions for method block."""
         completions = server._get_block_specific_completions("method")
-        assert isinstance(completions, list)
         assert any("D3" in item.label or "D4" in item.label for item in completions)
 
     def test_get_block_specific_completions_scf(self, server):
         """Test completions for scf block."""
         completions = server._get_block_specific_completions("scf")
-        assert isinstance(completions, list)
         labels = [item.label for item in completions]
         assert any(opt in labels for opt in ["maxiter", "convergence", "NRMaxIt"])
 
     def test_get_block_specific_completions_unknown(self, server):
         """Test completions for unknown block."""
         completions = server._get_block_specific_completions("unknown_block")
-        assert isinstance(completions, list)
         assert len(completions) == 0
 
 
@@ -236,7 +231,7 @@ class TestServerHover:
         """Test getting word at end of line."""
         mock_doc = MockTextDocument("B3LYP def2-TZVP")
         word = server._get_word_at_position(mock_doc, Position(line=0, character=6))
-        assert word == "def2"
+        assert word == "def2-TZVP"
 
 
 class TestServerDiagnostics:
@@ -244,9 +239,13 @@ class TestServerDiagnostics:
 
     @pytest.fixture
     def server(self):
-        server = ORCALanguageServer()
-        type(server).workspace = PropertyMock(return_value=MagicMock())
-        return server
+        # One patcher for both attributes, undone when the test finishes
+        with patch.multiple(
+            ORCALanguageServer,
+            workspace=PropertyMock(return_value=MagicMock()),
+            publish_diagnostics=DEFAULT,
+        ):
+            yield ORCALanguageServer()
 
     def test_validate_document_with_errors(self, server):
         """Test document validation with errors."""
@@ -254,8 +253,6 @@ class TestServerDiagnostics:
         mock_doc = MockTextDocument(content)
         server.workspace.get_text_document.return_value = mock_doc
 
-        server.publish_diagnostics = MagicMock()
-
         server._validate_document("file:///test.inp")
 
         server.publish_diagnostics.assert_called_once()
@@ -270,8 +267,6 @@ class TestServerDiagnostics:
         mock_doc = MockTextDocument(content)
         server.workspace.get_text_document.return_value = mock_doc
 
-        server.publish_diagnostics = MagicMock()
-
         server._validate_document("file:///test.inp")
 
         server.publish_diagnostics.assert_called_once()
@@ -291,8 +286,6 @@ H 0 1 0
         mock_doc = MockTextDocument(content)
         server.workspace.get_text_document.return_value = mock_doc
 
-        server.publish_diagnostics = MagicMock()
-
         server._validate_document("file:///test.inp")
 
         server.publish_diagnostics.assert_called_once()
@@ -317,7 +310,7 @@ class TestServerCodeActions:
 
         diagnostic = Diagnostic(
             range=Range(start=Position(line=0, character=0), end=Position(line=0, character=20)),
-            message="Missing %maxcore setting. Recommended: %maxcore 2000-4000",
+            message="Missing %maxcore setting. Recommended for this system: %maxcore 1000",
             severity=DiagnosticSeverity.Warning,
             source="orca-lsp",
         )
@@ -363,9 +356,13 @@ class TestServerDocumentEvents:
 
     @pytest.fixture
     def server(self):
-        server = ORCALanguageServer()
-        type(server).workspace = PropertyMock(return_value=MagicMock())
-        return server
+        # One patcher for both attributes, undone when the test finishes
+        with patch.multiple(
+            ORCALanguageServer,
+            workspace=PropertyMock(return_value=MagicMock()),
+            publish_diagnostics=DEFAULT,
+        ):
+            yield ORCALanguageServer()
 
     def test_on_did_open(self, server):
         """Test document open event."""
@@ -373,8 +370,6 @@ class TestServerDocumentEvents:
         mock_doc = MockTextDocument(content)
         server.workspace.get_text_document.return_value = mock_doc
 
-        server.publish_diagnostics = MagicMock()
-
         params = DidOpenTextDocumentParams(
             text_document=TextDocumentItem(
                 uri="file:///test.inp", language_id="orca", version=1, text=content
@@ -391,8 +386,6 @@ class TestServerDocumentEvents:
         mock_doc = MockTextDocument(content)
         server.workspace.get_text_document.return_value = mock_doc
 
-        server.publish_diagnostics = MagicMock()
-
         params = DidChangeTextDocumentParams(
             text_document=VersionedTextDocumentIdentifier(uri="file:///test.inp", version=2),
             content_changes=[],
@@ -114,14 +114,14 @@ class TestServerHoverAllCases:
         mock_doc = MagicMock()
         mock_doc.lines = ["unknown_word"]
         word = server._get_word_at_position(mock_doc, Position(line=0, character=0))
-        assert word == "unknown"
+        assert word == "unknown_word"
 
     def test_hover_basis_set_variant(self, server):
         """Test hover on basis set."""
         mock_doc = MagicMock()
         mock_doc.lines = ["! def2-TZVP"]
         word = server._get_word_at_position(mock_doc, Position(line=0, character=2))
-        assert word == "def2"
+        assert word == "def2-TZVP"
 
 
 class TestServerDocumentValidation:
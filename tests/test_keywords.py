@@ -1,5 +1,7 @@
 """Tests for ORCA keywords."""
 
+import pytest
+
 from orca_lsp.keywords import (
     DFT_FUNCTIONALS,
     WAVEFUNCTION_METHODS,
@@ -7,6 +9,15 @@ from orca_lsp.keywords import (
     JOB_TYPES,
     PERCENT_BLOCKS,
     ELEMENTS,
+    ALL_KEYWORDS,
+    ALL_METHOD_KEYS,
+    DFT_FUNCTIONAL_KEYS,
+    ELEMENTS_SET,
+    ELEMENTS_SORTED,
+    MAXCORE_RECOMMENDATIONS,
+    recommend_maxcore,
+    DFT_FUNCTIONALS_UPPER,
+    BASIS_SETS_UPPER,
 )
 
 
@@ -44,3 +55,45 @@ class TestKeywords:
         assert "H" in ELEMENTS
         assert "C" in ELEMENTS
         assert "O" in ELEMENTS
+
+    def test_key_sets(self):
+        """Test precomputed key sets mirror the keyword dictionaries."""
+        assert isinstance(DFT_FUNCTIONAL_KEYS, frozenset)
+        assert DFT_FUNCTIONAL_KEYS == set(DFT_FUNCTIONALS)
+        assert ALL_METHOD_KEYS == set(DFT_FUNCTIONALS) | set(WAVEFUNCTION_METHODS)
+        assert ELEMENTS_SET == set(ELEMENTS)
+        assert ELEMENTS_SORTED == tuple(sorted(ELEMENTS))
+
+    def test_all_keywords_includes_additional_functionals(self):
+        """Test ALL_KEYWORDS includes functionals added in v0.5.2."""
+        assert "ωB97X-D3" in ALL_KEYWORDS
+        assert "def2-TZVP" in ALL_KEYWORDS
+
+    def test_recommend_maxcore(self):
+        """Test %maxcore recommendation buckets by atom count."""
+        assert recommend_maxcore(3) == MAXCORE_RECOMMENDATIONS["small"]
+        assert recommend_maxcore(50) == MAXCORE_RECOMMENDATIONS["medium"]
+        assert recommend_maxcore(150) == MAXCORE_RECOMMENDATIONS["large"]
+        assert recommend_maxcore(500) == MAXCORE_RECOMMENDATIONS["very_large"]
+
+    @pytest.mark.parametrize(
+        "n_atoms, size",
+        [
+            (49, "small"),
+            (50, "medium"),
+            (99, "medium"),
+            (100, "large"),
+            (199, "large"),
+            (200, "very_large"),
+            (201, "very_large"),
+        ],
+    )
+    def test_recommend_maxcore_boundaries(self, n_atoms, size):
+        """Test each threshold opens the next bucket."""
+        assert recommend_maxcore(n_atoms) == MAXCORE_RECOMMENDATIONS[size]
+
+    def test_upper_case_maps(self):
+        """Test upper-case lookup maps return canonical spellings."""
+        assert DFT_FUNCTIONALS_UPPER["ΩB97X-D"] == "ωB97X-D"
+        assert BASIS_SETS_UPPER["DEF2-TZVP"] == "def2-TZVP"
+        assert len(BASIS_SETS_UPPER) == len(BASIS_SETS)
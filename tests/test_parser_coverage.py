@@ -1,7 +1,23 @@
 """Tests to improve parser coverage."""
 
+import sys
+
 import pytest
-from orca_lsp.parser import ORCAParser, SimpleInput, PercentBlock, Atom, Geometry
+from orca_lsp.parser import (
+    DiagCode,
+    ORCAParser,
+    SimpleInput,
+    PercentBlock,
+    Atom,
+    Geometry,
+    ParseResult,
+)
+
+
+@pytest.fixture(scope="module")
+def parser():
+    """One parser for the module; parsing leaves no state behind."""
+    return ORCAParser()
 
 
 class TestSimpleInput:
@@ -22,6 +38,17 @@ class TestSimpleInput:
         si = SimpleInput()
         assert si.is_valid() is False
 
+    def test_canonical_strings_are_shared(self, parser):
+        """Test parsed keywords and elements reuse the keyword-table string objects."""
+        from orca_lsp.keywords import BASIS_SETS_UPPER, ELEMENTS
+
+        first = parser.parse("! b3lyp DEF2-SVP\n* xyz 0 1\nh 0 0 0\n*")
+        second = parser.parse("! B3LYP def2-svp\n* xyz 0 1\nH 1 0 0\n*")
+        assert first.simple_input.methods[0] is second.simple_input.methods[0]
+        assert first.simple_input.basis_sets[0] is BASIS_SETS_UPPER["DEF2-SVP"]
+        assert first.geometry.atoms[0].element is ELEMENTS[0]
+        assert second.geometry.atoms[0].element is ELEMENTS[0]
+
 
 class TestPercentBlock:
     """Test PercentBlock dataclass."""
@@ -36,6 +63,21 @@ class TestPercentBlock:
         pb = PercentBlock()
         assert pb.is_valid() is False
 
+    def test_block_integer_parameters(self, parser):
+        """Test keyword/integer pairs are read from single- and multi-line blocks."""
+        block, _ = parser.parse_percent_block(["%PAL NPROCS 8 END"], 0)
+        assert block.parameters == {"nprocs": 8}
+        block, _ = parser.parse_percent_block(["%scf", "  MaxIter 250", "end"], 0)
+        assert block.parameters == {"maxiter": 250}
+        block, _ = parser.parse_percent_block(["%scf", "  maxiter", "end"], 0)
+        assert block.parameters == {}
+
+    @pytest.mark.parametrize("line", ["%pal nprocs4 end", "%pal nprocs=4 end"])
+    def test_block_keyword_inside_larger_token(self, parser, line):
+        """Test a keyword that is only part of a longer token yields no parameter."""
+        block, _ = parser.parse_percent_block([line], 0)
+        assert block.parameters == {}
+
 
 class TestAtom:
     """Test Atom dataclass."""
@@ -71,14 +113,25 @@ class TestGeometry:
         geom.atoms = [Atom(element="Xx", x=0, y=0, z=0)]
         assert geom.is_valid() is False
 
+    def test_struct_of_arrays_views(self):
+        """Test element list and flat coordinate buffer views."""
+        geom = Geometry()
+        geom.atoms = [Atom("O", 0.0, 0.0, 0.1), Atom("H", 0.75, 0.58, 0.0)]
+        assert geom.elements() == ["O", "H"]
+        coords = geom.coordinates()
+        assert coords.typecode == "d"
+        assert list(coords) == [0.0, 0.0, 0.1, 0.75, 0.58, 0.0]
+
+    def test_invalid_atoms_collected_while_parsing(self, parser):
+        """Test parse_geometry records atoms with unknown element symbols."""
+        geom, _ = parser.parse_geometry(["* xyz 0 1", "H 0 0 0", "Xx 1 0 0", "Qq 2 0 0", "*"], 0)
+        assert [a.element for a in geom.invalid_atoms] == ["Xx", "Qq"]
+        assert geom.is_valid() is False
+
 
 class TestParserFullCoverage:
     """Test parser for full coverage."""
 
-    @pytest.fixture
-    def parser(self):
-        return ORCAParser()
-
     def test_parse_comments(self, parser):
         """Test parsing with comments."""
         content = "# This is a comment\n! B3LYP def2-SVP\n* xyz 0 1\nH 0 0 0\n*"
@@ -97,6 +150,19 @@ class TestParserFullCoverage:
         result = parser.parse(content)
         assert len(result.simple_input.methods) > 0
 
+    def test_parse_simple_input_canonical_case(self, parser):
+        """Test case-insensitive keywords are stored in canonical spelling."""
+        result = parser.parse_simple_input("! b3lyp DEF2-TZVP opt", 0)
+        assert result.methods == ["B3LYP"]
+        assert result.basis_sets == ["def2-TZVP"]
+        assert result.job_types == ["OPT"]
+
+    def test_parse_simple_input_method_takes_precedence(self, parser):
+        """Test SCAN (both a functional and a job type) is classified as a method."""
+        result = parser.parse_simple_input("! scan", 0)
+        assert result.methods == ["SCAN"]
+        assert result.job_types == []
+
     def test_parse_unknown_keyword(self, parser):
         """Test parsing with unknown keyword."""
         content = "! B3LYP UNKNOWN_KEYWORD def2-SVP\n* xyz 0 1\nH 0 0 0\n*"
@@ -114,7 +180,7 @@ end
 H 0 0 0
 *"""
         result = parser.parse(content)
-        assert any(b.name == "scf" for b in result.percent_blocks)
+        assert "scf" in result.percent_blocks_by_name
 
     def test_parse_method_block_d3bj(self, parser):
         """Test parsing %method block with D3BJ."""
@@ -127,7 +193,7 @@ end
 H 0 0 0
 *"""
         result = parser.parse(content)
-        method_block = next((b for b in result.percent_blocks if b.name == "method"), None)
+        method_block = result.percent_blocks_by_name.get("method")
         if method_block:
             assert method_block.parameters.get("dispersion") == "D3BJ"
 
@@ -142,7 +208,7 @@ end
 H 0 0 0
 *"""
         result = parser.parse(content)
-        method_block = next((b for b in result.percent_blocks if b.name == "method"), None)
+        method_block = result.percent_blocks_by_name.get("method")
         if method_block:
             assert method_block.parameters.get("dispersion") == "D4"
 
@@ -175,6 +241,53 @@ H 0 0 0
         parser.parse(content)
         # Should handle gracefully
 
+    def test_parse_geometry_element_case_normalized(self, parser):
+        """Test element symbols are normalized to canonical capitalization."""
+        content = "! B3LYP def2-SVP\n* xyz 0 1\nFE 0 0 0\ncl 0 0 2\n*"
+        result = parser.parse(content)
+        assert [a.element for a in result.geometry.atoms] == ["Fe", "Cl"]
+        assert not any("Invalid element" in e["message"] for e in result.errors)
+
+    def test_parse_geometry_trailing_columns(self, parser):
+        """Test extra columns after the coordinates are ignored."""
+        content = "! B3LYP def2-SVP\n* xyz 0 1\nO 0.0 0.0 0.1 M = 15.995 # label\n*"
+        result = parser.parse(content)
+        atom = result.geometry.atoms[0]
+        assert (atom.element, atom.x, atom.y, atom.z) == ("O", 0.0, 0.0, 0.1)
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            ("* xyz 0 1", ("xyz", 0, 1)),
+            ("*xyz 0 1", ("xyz", 0, 1)),
+            ("*xyz -1 2", ("xyz", -1, 2)),
+            ("* XYZFile 1 3 mol.xyz", ("xyzfile", 1, 3)),
+            ("* int", ("int", 0, 1)),
+        ],
+    )
+    def test_parse_geometry_header(self, parser, header, expected):
+        """Test format, charge and multiplicity are read from the header."""
+        geom, _ = parser.parse_geometry([header, "*"], 0)
+        assert (geom.format_type, geom.charge, geom.multiplicity) == expected
+        assert geom.invalid_header is False
+
+    @pytest.mark.parametrize("header", ["**", "* 0 1", "*"])
+    def test_parse_geometry_header_needs_format(self, parser, header):
+        """Test a header without a format word is not a geometry section."""
+        geom, _ = parser.parse_geometry([header, "*"], 0)
+        assert geom is None
+        result = parser.parse(f"! B3LYP def2-SVP\n{header}\n*")
+        assert any(e["code"] == DiagCode.MISSING_GEOMETRY for e in result.errors)
+
+    @pytest.mark.parametrize("header", ["* xyz 0 x", "* xyz 1 x", "* xyz 0", "*xyz. 0 1"])
+    def test_parse_geometry_bad_charge_multiplicity(self, parser, header):
+        """Test a header whose charge/multiplicity cannot be read is reported."""
+        geom, _ = parser.parse_geometry([header, "*"], 0)
+        assert geom.invalid_header is True
+        result = parser.parse(f"! B3LYP def2-SVP\n{header}\nH 0 0 0\n*")
+        (error,) = [e for e in result.errors if e["code"] == DiagCode.INVALID_GEOMETRY_HEADER]
+        assert error["line"] == 1
+
     def test_parse_internal_coordinates(self, parser):
         """Test parsing internal coordinates."""
         content = "! B3LYP def2-SVP\n* int 0 1\nH 0 0 0\n*"
@@ -186,25 +299,33 @@ H 0 0 0
         """Test diagnostics for missing basis set."""
         content = "! B3LYP\n* xyz 0 1\nH 0 0 0\n*"
         result = parser.parse(content)
-        assert any("basis set" in e.get("message", "").lower() for e in result.errors)
+        assert any(e["code"] == DiagCode.MISSING_BASIS for e in result.errors)
 
     def test_parse_missing_method(self, parser):
         """Test diagnostics for missing method."""
         content = "! def2-SVP\n* xyz 0 1\nH 0 0 0\n*"
         result = parser.parse(content)
-        assert any("method" in e.get("message", "").lower() for e in result.errors)
+        assert any(e["code"] == DiagCode.MISSING_METHOD for e in result.errors)
 
     def test_parse_with_maxcore_warning(self, parser):
         """Test warning for missing maxcore."""
         content = "! B3LYP def2-SVP\n* xyz 0 1\nH 0 0 0\n*"
         result = parser.parse(content)
-        assert any("maxcore" in w.get("message", "").lower() for w in result.warnings)
+        assert any(w["code"] == DiagCode.MISSING_MAXCORE for w in result.warnings)
+
+    def test_maxcore_warning_sized_to_geometry(self, parser):
+        """Test the recommended %maxcore follows the atom count."""
+        atoms = "\n".join(f"C {i}.0 0.0 0.0" for i in range(120))
+        small = parser.parse("! B3LYP def2-SVP\n* xyz 0 1\nH 0 0 0\n*")
+        large = parser.parse(f"! B3LYP def2-SVP\n* xyz 0 1\n{atoms}\n*")
+        assert "%maxcore 1000 (MB per core)" in small.warnings[0]["message"]
+        assert "%maxcore 4000 (MB per core)" in large.warnings[0]["message"]
 
     def test_parse_percent_block_single_line_with_end(self, parser):
         """Test single line % block with end."""
         content = "! B3LYP def2-SVP\n%pal nprocs 4 end\n* xyz 0 1\nH 0 0 0\n*"
         result = parser.parse(content)
-        pal_block = next((b for b in result.percent_blocks if b.name == "pal"), None)
+        pal_block = result.percent_blocks_by_name.get("pal")
         assert pal_block is not None
         assert pal_block.parameters.get("nprocs") == 4
 
@@ -228,3 +349,83 @@ H 0 0 0
         result = parser.parse(content)
         # Should handle gracefully
         assert result is not None
+
+    def test_parse_percent_block_end_terminator_case(self, parser):
+        """Test block terminators are matched case-insensitively."""
+        block, end_line = parser.parse_percent_block(["%scf", "  maxiter 50", "  END"], 0)
+        assert end_line == 2
+        assert block.parameters["maxiter"] == 50
+
+        block, end_line = parser.parse_percent_block(["%scf", "  maxiter 75 End"], 0)
+        assert end_line == 1
+        assert block.parameters["maxiter"] == 75
+
+    def test_parse_percent_block_inline_end_any_case(self, parser):
+        """Test an upper-case 'END' on the first line closes the block there."""
+        block, end_line = parser.parse_percent_block(["%pal nprocs 4 END", "! B3LYP"], 0)
+        assert end_line == 0
+        assert block.parameters["nprocs"] == 4
+
+    def test_parse_percent_block_end_requires_separator(self, parser):
+        """Test a word merely ending in 'end' does not close a block."""
+        block, end_line = parser.parse_percent_block(["%scf", "  weekend", "end"], 0)
+        assert end_line == 2
+
+    def test_simple_input_diagnostics_use_line_number(self, parser):
+        """Test missing method/basis errors point at the simple input line."""
+        content = "# header\n\n! OPT\n* xyz 0 1\nH 0 0 0\n*"
+        result = parser.parse(content)
+        assert result.simple_input.line_number == 2
+        simple_errors = [e for e in result.errors if "simple input" in e["message"]]
+        assert len(simple_errors) == 2
+        assert all(e["line"] == 2 for e in simple_errors)
+
+    def test_percent_blocks_by_name(self, parser):
+        """Test blocks are indexed by name, keeping the first of each."""
+        content = "! B3LYP def2-SVP\n%pal nprocs 4 end\n%scf maxiter 50 end\n%pal nprocs 8 end"
+        result = parser.parse(content)
+        assert len(result.percent_blocks) == 3
+        assert set(result.percent_blocks_by_name) == {"pal", "scf"}
+        assert result.percent_blocks_by_name["pal"] is result.percent_blocks[0]
+        assert result.percent_blocks_by_name["scf"].parameters["maxiter"] == 50
+
+    def test_crlf_line_endings(self, parser):
+        """Test Windows line endings parse like Unix ones."""
+        content = "! B3LYP def2-SVP\r\n%maxcore 2000\r\n* xyz 0 1\r\nH 0 0 0\r\n*\r\n"
+        result = parser.parse(content)
+        assert result.percent_blocks[0].raw_content == "%maxcore 2000"
+        assert result.geometry.line_end == 4
+        assert result.errors == []
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+")
+class TestSlottedResults:
+    """Test parse-result dataclasses are slotted."""
+
+    @pytest.mark.parametrize("cls", [SimpleInput, PercentBlock, Atom, Geometry, ParseResult])
+    def test_no_instance_dict(self, cls):
+        """Test instances carry no per-instance __dict__."""
+        assert not hasattr(cls(), "__dict__")
+
+
+class TestParseCached:
+    """Test memoized parsing."""
+
+    def test_identical_content_reuses_result(self, parser):
+        """Test identical content returns the same result object."""
+        content = "! B3LYP def2-SVP\n* xyz 0 1\nH 0 0 0\n*"
+        assert parser.parse_cached(content) is parser.parse_cached(content)
+
+    def test_cache_clear_forces_reparse(self, parser):
+        """Test cache_clear drops remembered results."""
+        content = "! HF def2-SVP\n* xyz 0 1\nH 0 0 0\n*"
+        first = parser.parse_cached(content)
+        parser.cache_clear()
+        assert parser.parse_cached(content) is not first
+
+    def test_changed_content_reparses(self, parser):
+        """Test different content yields a fresh result."""
+        first = parser.parse_cached("! B3LYP def2-SVP")
+        second = parser.parse_cached("! HF def2-SVP")
+        assert first is not second
+        assert second.simple_input.methods == ["HF"]
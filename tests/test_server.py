@@ -1,14 +1,47 @@
 """Tests for ORCA LSP server."""
 
+import sys
+from types import SimpleNamespace
+
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 from lsprotocol.types import (
     Position,
 )
 
+from orca_lsp.parser import DiagCode
 from orca_lsp.server import ORCALanguageServer, main
 
 
+class _StubDoc:
+    """Minimal stand-in for a pygls TextDocument"""
+
+    __slots__ = ("lines", "source", "uri")
+
+    def __init__(self, lines, source="", uri="file:///test.inp"):
+        self.lines = lines
+        self.source = source
+        self.uri = uri
+
+
+class _FakeParser:
+    """Parser stand-in that hands back a fixed result"""
+
+    def __init__(self, result):
+        self._result = result
+
+    def parse(self, _content):
+        return self._result
+
+    parse_cached = parse
+
+
+@pytest.fixture(scope="module")
+def server():
+    """One server for the module; these tests only read its state."""
+    return ORCALanguageServer()
+
+
 class TestORCALanguageServer:
     """Test ORCA Language Server."""
 
@@ -22,10 +55,6 @@ class TestORCALanguageServer:
 class TestCompletions:
     """Test completion feature."""
 
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
     def test_get_percent_completions(self, server):
         """Test percent block completions."""
         completions = server._get_percent_completions("% max")
@@ -75,44 +104,35 @@ class TestCompletions:
 class TestHover:
     """Test hover feature."""
 
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
     def test_hover_dft_functional(self, server):
         """Test hover on DFT functional."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! B3LYP def2-TZVP"]
+        mock_doc = _StubDoc(["! B3LYP def2-TZVP"])
 
         word = server._get_word_at_position(mock_doc, Position(line=0, character=4))
         assert word == "B3LYP"
 
     def test_hover_basis_set(self, server):
         """Test hover on basis set."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! B3LYP def2-TZVP"]
+        mock_doc = _StubDoc(["! B3LYP def2-TZVP"])
 
         word = server._get_word_at_position(mock_doc, Position(line=0, character=12))
-        assert word == "def2"
+        assert word == "def2-TZVP"
 
     def test_get_word_at_position(self, server):
         """Test getting word at position."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["hello world"]
+        mock_doc = _StubDoc(["hello world"])
         word = server._get_word_at_position(mock_doc, Position(line=0, character=0))
         assert word == "hello"
 
     def test_get_word_at_position_middle(self, server):
         """Test getting word at middle position."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["hello world"]
+        mock_doc = _StubDoc(["hello world"])
         word = server._get_word_at_position(mock_doc, Position(line=0, character=6))
         assert word == "world"
 
     def test_get_word_at_position_empty(self, server):
         """Test getting word at empty position."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["   "]
+        mock_doc = _StubDoc(["   "])
         word = server._get_word_at_position(mock_doc, Position(line=0, character=1))
         assert word == ""
 
@@ -120,10 +140,6 @@ class TestHover:
 class TestDiagnostics:
     """Test diagnostic feature."""
 
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
     def test_parser_has_errors(self, server):
         """Test that parser returns errors for invalid input."""
         result = server.parser.parse("")
@@ -136,20 +152,29 @@ class TestDiagnostics:
         # Should have warnings about missing maxcore but no errors
         assert result.simple_input is not None
 
+    def test_validate_document(self):
+        """Test validation publishes the parser's diagnostics."""
+        test_server = ORCALanguageServer()
+        test_server.parser = _FakeParser(SimpleNamespace(errors=[], warnings=[]))
+        doc = SimpleNamespace(uri="file:///test.inp", source="! HF")
+        test_server.publish_diagnostics = MagicMock()
+
+        with patch.object(type(test_server), "workspace", new_callable=PropertyMock) as workspace:
+            workspace.return_value.get_text_document.return_value = doc
+            test_server._validate_document(doc.uri)
+
+        test_server.publish_diagnostics.assert_called_once_with(doc.uri, [])
+
 
 class TestCodeActions:
     """Test code action feature."""
 
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
     def test_code_action_logic(self, server):
         """Test code action logic for maxcore."""
         # Test the logic directly without workspace
         mock_diagnostic = MagicMock()
         mock_diagnostic.message = (
-            "Missing %maxcore setting. Recommended: %maxcore 2000-4000 (MB per core)"
+            "Missing %maxcore setting. Recommended for this system: %maxcore 1000 (MB per core)"
         )
 
         # Verify the condition check
@@ -159,10 +184,6 @@ class TestCodeActions:
 class TestDocumentEvents:
     """Test document events."""
 
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
     def test_parser_on_did_open(self, server):
         """Test parser is called on document open."""
         content = "! B3LYP def2-TZVP"
@@ -187,14 +208,23 @@ class TestMain:
         main()
         mock_server.start_io.assert_called_once()
 
+    @patch("orca_lsp.server.ORCALanguageServer")
+    def test_main_installs_uvloop_before_server(self, mock_server_class):
+        """Test that uvloop, when available, is installed before the loop exists."""
+        calls = []
+        fake_uvloop = MagicMock()
+        fake_uvloop.install.side_effect = lambda: calls.append("install")
+        mock_server_class.side_effect = lambda: calls.append("server") or MagicMock()
+
+        with patch.dict(sys.modules, {"uvloop": fake_uvloop}):
+            main()
+
+        assert calls == ["install", "server"]
+
 
 class TestParserIntegration:
     """Test parser integration with server."""
 
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
     def test_parse_water_molecule(self, server):
         """Test parsing water molecule input."""
         content = """! B3LYP def2-TZVP OPT
@@ -236,16 +266,13 @@ Xx 0 0 0
 """
         result = server.parser.parse(content)
         # Should have error for invalid element
-        assert any("Invalid element" in e.get("message", "") for e in result.errors)
+        assert any(e["code"] == DiagCode.INVALID_ELEMENT for e in result.errors)
+        assert any("Invalid element symbol: Xx" == e["message"] for e in result.errors)
 
 
 class TestKeywordLookup:
     """Test keyword lookup functions."""
 
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
     def test_dft_functional_lookup(self, server):
         """Test DFT functional documentation lookup."""
         from orca_lsp.keywords import DFT_FUNCTIONALS
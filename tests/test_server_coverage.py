@@ -1,11 +1,17 @@
 """Tests to achieve 100% coverage for server.py."""
 
-from unittest.mock import MagicMock, PropertyMock, patch
+import asyncio
+import copy
+from types import SimpleNamespace
+from unittest.mock import PropertyMock, patch
 
 import pytest
 from lsprotocol.types import (
+    ClientCapabilities,
     CodeActionContext,
     CodeActionParams,
+    CompletionItem,
+    CompletionItemKind,
     CompletionList,
     CompletionParams,
     Diagnostic,
@@ -14,561 +20,915 @@ from lsprotocol.types import (
     DidOpenTextDocumentParams,
     Hover,
     HoverParams,
+    InitializeParams,
     Position,
     Range,
+    TextDocumentContentChangeEvent_Type2,
     TextDocumentIdentifier,
     TextDocumentItem,
     VersionedTextDocumentIdentifier,
 )
 
-from orca_lsp.server import ORCALanguageServer
+from pygls.workspace import TextDocument
+
+from orca_lsp.parser import DiagCode, ParseResult
+from orca_lsp.keywords import PERCENT_BLOCKS
+from orca_lsp.server import (
+    _BASIS_COMPLETIONS,
+    _JOB_COMPLETIONS,
+    _METHOD_COMPLETIONS,
+    _PARSE_RESULTS_SIZE,
+    ORCALanguageServer,
+)
+
+_URI = "file:///test.orca"
+_DOC_ID = TextDocumentIdentifier(uri=_URI)
+_LINE_0_RANGE = Range(start=Position(line=0, character=0), end=Position(line=0, character=20))
+_HOVER_0_4 = HoverParams(text_document=_DOC_ID, position=Position(line=0, character=4))
+
+_DIAG_MAXCORE = Diagnostic(
+    range=_LINE_0_RANGE,
+    message="Missing %maxcore setting. Recommended for this system: %maxcore 1000 (MB per core)",
+    severity=DiagnosticSeverity.Warning,
+    source="orca-lsp",
+)
+_DIAG_OTHER = Diagnostic(
+    range=_LINE_0_RANGE, message="Some other error", severity=DiagnosticSeverity.Error
+)
+_CTX_BOTH = CodeActionContext(diagnostics=[_DIAG_MAXCORE, _DIAG_OTHER])
+
+# didOpen/didChange handlers only read the URI, so skip building the models
+_URI_ONLY_PARAMS = SimpleNamespace(text_document=SimpleNamespace(uri=_URI))
+
+# The fake workspaces never apply edits, so one change list serves every didChange
+_CONTENT_CHANGES = [TextDocumentContentChangeEvent_Type2(text="new content")]
+_DID_CHANGE_PARAMS = DidChangeTextDocumentParams(
+    text_document=VersionedTextDocumentIdentifier(uri=_URI, version=2),
+    content_changes=_CONTENT_CHANGES,
+)
+
+_VALID_SOURCE = "! B3LYP def2-TZVP\n%maxcore 4000\n* xyz 0 1\nH 0 0 0\n*"
+_SAMPLES = {
+    "empty": "",
+    "no_maxcore": "! B3LYP def2-TZVP\n* xyz 0 1\nH 0 0 0\n*",
+    "valid": _VALID_SOURCE,
+}
+
+
+class _FakeDoc:
+    """Plain stand-in for a pygls TextDocument"""
+
+    __slots__ = ("lines", "source", "uri")
+
+    def __init__(self, lines=(), source="", uri=_URI):
+        self.lines = list(lines)
+        self.source = source
+        self.uri = uri
+
+
+# Documents several tests start from; take a copy.copy rather than rebuilding them
+_ROUTE_DOC = _FakeDoc(lines=["! B3LYP def2-TZVP"], source="! B3LYP def2-TZVP")
+_B3LYP_DOC = _FakeDoc(lines=["! B3LYP"], source="! B3LYP")
+_VALID_DOC = _FakeDoc(lines=_VALID_SOURCE.split("\n"), source=_VALID_SOURCE)
+
+
+class _TestServer(ORCALanguageServer):
+    """Server whose workspace is a plain attribute tests can assign"""
+
+    workspace = None
+
+    def publish_diagnostics(self, uri, diagnostics):
+        """No client is connected; see capture_publish to inspect publishes"""
+
+
+def _workspace(document):
+    """Workspace stand-in that serves ``document`` for any URI"""
+    return SimpleNamespace(get_text_document=lambda uri: document)
+
+
+def _fresh_copy(template):
+    """Shallow-copy a server, keeping its parser but none of its document state.
+
+    The copy shares ``lsp`` and the handlers registered for the template, so
+    it is only for calling methods directly and must never be served.
+    """
+    clone = copy.copy(template)
+    clone._reset_document_state()
+    return clone
+
+
+@pytest.fixture(scope="session")
+def _server_template():
+    """Construct the server once for the whole session."""
+    return _TestServer()
+
+
+@pytest.fixture(scope="session")
+def diags(_server_template):
+    """Diagnostics of each sample input, computed once for the session."""
+    return {
+        name: _server_template._to_diagnostics(_server_template.parser.parse_cached(source))
+        for name, source in _SAMPLES.items()
+    }
+
+
+@pytest.fixture
+def server(_server_template):
+    """Give each test its own copy, with no document state."""
+    return _fresh_copy(_server_template)
+
+
+@pytest.fixture
+def capture_publish(server, monkeypatch):
+    """Record the server's published (uri, diagnostics) instead of sending them."""
+    calls = []
+    monkeypatch.setattr(
+        server, "publish_diagnostics", lambda uri, diagnostics: calls.append((uri, diagnostics))
+    )
+    return calls
 
 
 class TestServerLSPFeatures:
     """Test LSP server features with full coverage."""
 
-    @pytest.fixture
-    def server(self):
-        """Create a server instance."""
-        return ORCALanguageServer()
+    def test_copy_has_fresh_document_state(self, _server_template):
+        """Test a copied server shares its setup but not its caches."""
+        _server_template._validated[_URI] = "! HF"
+        try:
+            clone = _fresh_copy(_server_template)
+        finally:
+            _server_template._validated.clear()
+
+        assert clone.parser is _server_template.parser
+        assert clone._validated == {}
+        assert clone._pending is not _server_template._pending
 
     def test_on_completion_simple_input(self, server):
         """Test _on_completion with simple input line."""
         # Setup mock document
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! B3LYP "]
+        mock_doc = _FakeDoc(lines=["! B3LYP "])
 
         # Mock workspace
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            params = CompletionParams(
-                text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-                position=Position(line=0, character=8),
-            )
+        server.workspace = _workspace(mock_doc)
+
+        params = CompletionParams(
+            text_document=_DOC_ID,
+            position=Position(line=0, character=8),
+        )
 
-            result = server._on_completion(params)
-            assert isinstance(result, CompletionList)
-            assert result is not None
+        result = server._on_completion(params)
+        assert isinstance(result, CompletionList)
+        assert result is not None
 
     def test_on_completion_percent_block(self, server):
         """Test _on_completion with percent block."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["%max"]
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            params = CompletionParams(
-                text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-                position=Position(line=0, character=4),
-            )
+        mock_doc = _FakeDoc(lines=["%max"])
+
+        server.workspace = _workspace(mock_doc)
 
-            result = server._on_completion(params)
-            assert isinstance(result, CompletionList)
+        params = CompletionParams(
+            text_document=_DOC_ID,
+            position=Position(line=0, character=4),
+        )
+
+        result = server._on_completion(params)
+        assert isinstance(result, CompletionList)
 
     def test_on_completion_geometry(self, server):
         """Test _on_completion in geometry section."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["* xyz 0 1", "O 0.0 0.0 "]
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            params = CompletionParams(
-                text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-                position=Position(line=1, character=10),
-            )
+        mock_doc = _FakeDoc(lines=["* xyz 0 1", "O 0.0 0.0 "])
+
+        server.workspace = _workspace(mock_doc)
+
+        params = CompletionParams(
+            text_document=_DOC_ID,
+            position=Position(line=1, character=10),
+        )
 
-            result = server._on_completion(params)
-            assert isinstance(result, CompletionList)
+        result = server._on_completion(params)
+        assert isinstance(result, CompletionList)
+
+    def test_on_completion_no_context_returns_none(self, server):
+        """Test _on_completion returns None where nothing can be completed."""
+        mock_doc = _FakeDoc(lines=["* xyz 0 1"])
+
+        server.workspace = _workspace(mock_doc)
+
+        params = CompletionParams(
+            text_document=_DOC_ID,
+            position=Position(line=0, character=9),
+        )
+
+        assert server._on_completion(params) is None
 
     def test_on_hover_dft_functional(self, server):
         """Test _on_hover with DFT functional."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! B3LYP def2-TZVP"]
-        mock_doc.source = "! B3LYP def2-TZVP"
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            params = HoverParams(
-                text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-                position=Position(line=0, character=4),
-            )
+        mock_doc = copy.copy(_ROUTE_DOC)
 
-            result = server._on_hover(params)
-            assert isinstance(result, Hover)
-            assert "B3LYP" in result.contents.value
+        server.workspace = _workspace(mock_doc)
+
+        params = _HOVER_0_4
+
+        result = server._on_hover(params)
+        assert isinstance(result, Hover)
+        assert "B3LYP" in result.contents.value
 
     def test_on_hover_wavefunction_method(self, server):
         """Test _on_hover with wavefunction method."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! MP2 cc-pVTZ"]
-        mock_doc.source = "! MP2 cc-pVTZ"
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            params = HoverParams(
-                text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-                position=Position(line=0, character=4),
-            )
+        mock_doc = _FakeDoc(lines=["! MP2 cc-pVTZ"], source="! MP2 cc-pVTZ")
 
-            result = server._on_hover(params)
-            assert isinstance(result, Hover)
-            assert "MP2" in result.contents.value
+        server.workspace = _workspace(mock_doc)
+
+        params = _HOVER_0_4
+
+        result = server._on_hover(params)
+        assert isinstance(result, Hover)
+        assert "MP2" in result.contents.value
 
     def test_on_hover_basis_set(self, server):
         """Test _on_hover with basis set."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! B3LYP def2-SVP"]
-        mock_doc.source = "! B3LYP def2-SVP"
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            params = HoverParams(
-                text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-                position=Position(line=0, character=14),  # Position at SVP
-            )
+        mock_doc = _FakeDoc(lines=["! B3LYP def2-SVP"], source="! B3LYP def2-SVP")
 
-            result = server._on_hover(params)
-            # Should return hover for SVP or None if not found
-            if result is not None:
-                assert isinstance(result, Hover)
+        server.workspace = _workspace(mock_doc)
+
+        params = HoverParams(
+            text_document=_DOC_ID,
+            position=Position(line=0, character=14),  # Position at SVP
+        )
+
+        result = server._on_hover(params)
+        assert result is not None
+        assert isinstance(result, Hover)
+        assert "def2-SVP" in result.contents.value
+        assert "basis" in result.contents.value
 
     def test_on_hover_job_type(self, server):
         """Test _on_hover with job type."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! B3LYP OPT"]
-        mock_doc.source = "! B3LYP OPT"
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            params = HoverParams(
-                text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-                position=Position(line=0, character=9),
-            )
+        mock_doc = _FakeDoc(lines=["! B3LYP OPT"], source="! B3LYP OPT")
+
+        server.workspace = _workspace(mock_doc)
 
-            result = server._on_hover(params)
-            assert isinstance(result, Hover)
-            assert "OPT" in result.contents.value
+        params = HoverParams(
+            text_document=_DOC_ID,
+            position=Position(line=0, character=9),
+        )
+
+        result = server._on_hover(params)
+        assert isinstance(result, Hover)
+        assert "OPT" in result.contents.value
 
     def test_on_hover_no_match(self, server):
         """Test _on_hover with unknown keyword."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! UNKNOWN"]
-        mock_doc.source = "! UNKNOWN"
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            params = HoverParams(
-                text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-                position=Position(line=0, character=4),
-            )
+        mock_doc = _FakeDoc(lines=["! UNKNOWN"], source="! UNKNOWN")
+
+        server.workspace = _workspace(mock_doc)
 
-            result = server._on_hover(params)
-            assert result is None
+        params = _HOVER_0_4
+
+        result = server._on_hover(params)
+        assert result is None
 
     def test_on_hover_empty_word(self, server):
         """Test _on_hover with empty position."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! B3LYP"]
-        mock_doc.source = "! B3LYP"
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            params = HoverParams(
-                text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-                position=Position(line=0, character=0),
-            )
+        mock_doc = _FakeDoc(lines=["! B3LYP"], source="! B3LYP")
 
-            result = server._on_hover(params)
-            # Empty word should return None
-            assert result is None or isinstance(result, Hover)
-
-    def test_validate_document_with_errors(self, server):
-        """Test _validate_document with parsing errors."""
-        mock_doc = MagicMock()
-        mock_doc.source = ""
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        # Mock publish_diagnostics
-        server.publish_diagnostics = MagicMock()
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            server._validate_document("file:///test.orca")
-
-            # Should publish diagnostics for empty file
-            server.publish_diagnostics.assert_called_once()
-            call_args = server.publish_diagnostics.call_args
-            assert call_args[0][0] == "file:///test.orca"
-            diagnostics = call_args[0][1]
-            assert len(diagnostics) > 0
-
-    def test_validate_document_with_warnings(self, server):
-        """Test _validate_document with warnings."""
-        content = "! B3LYP def2-TZVP\n* xyz 0 1\nH 0 0 0\n*"
-        mock_doc = MagicMock()
-        mock_doc.source = content
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        server.publish_diagnostics = MagicMock()
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            server._validate_document("file:///test.orca")
-
-            server.publish_diagnostics.assert_called_once()
-            call_args = server.publish_diagnostics.call_args
-            diagnostics = call_args[0][1]
-            # Should have warnings about missing maxcore
-            assert any(d.severity == DiagnosticSeverity.Warning for d in diagnostics)
-
-    def test_validate_document_valid(self, server):
-        """Test _validate_document with valid input."""
-        content = "! B3LYP def2-TZVP\n%maxcore 4000\n* xyz 0 1\nH 0 0 0\n*"
-        mock_doc = MagicMock()
-        mock_doc.source = content
-
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        server.publish_diagnostics = MagicMock()
-
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            server._validate_document("file:///test.orca")
-
-            server.publish_diagnostics.assert_called_once()
-            call_args = server.publish_diagnostics.call_args
-            diagnostics = call_args[0][1]
-            # Should have no errors, only possibly warnings
-            assert (
-                not any(d.severity == DiagnosticSeverity.Error for d in diagnostics)
-                or len(diagnostics) == 0
-            )
+        server.workspace = _workspace(mock_doc)
+
+        params = HoverParams(
+            text_document=_DOC_ID,
+            position=Position(line=0, character=0),
+        )
+
+        result = server._on_hover(params)
+        # Empty word should return None
+        assert result is None or isinstance(result, Hover)
+
+    def test_diagnostics_for_empty_input(self, diags):
+        """Test an empty file produces errors."""
+        assert any(d.severity == DiagnosticSeverity.Error for d in diags["empty"])
+
+    def test_diagnostics_for_missing_maxcore(self, diags):
+        """Test a missing %maxcore produces a warning."""
+        assert any(d.severity == DiagnosticSeverity.Warning for d in diags["no_maxcore"])
+
+    def test_validate_document_valid(self, server, capture_publish, diags):
+        """Test _validate_document publishes the diagnostics of valid input."""
+        server.workspace = _workspace(copy.copy(_VALID_DOC))
+
+        server._validate_document(_URI)
+
+        assert capture_publish == [(_URI, diags["valid"])]
+        # Should have no errors, only possibly warnings
+        assert not any(d.severity == DiagnosticSeverity.Error for d in diags["valid"])
 
     def test_on_code_action_maxcore_fix(self, server):
         """Test _on_code_action with maxcore quick fix."""
-        mock_doc = MagicMock()
-        mock_doc.source = "! B3LYP def2-TZVP"
+        mock_doc = copy.copy(_ROUTE_DOC)
+
+        server.workspace = _workspace(mock_doc)
+
+        params = CodeActionParams(
+            text_document=_DOC_ID,
+            range=_LINE_0_RANGE,
+            context=CodeActionContext(diagnostics=[_DIAG_MAXCORE]),
+        )
+
+        result = server._on_code_action(params)
 
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
+        assert isinstance(result, list)
+        assert len(result) > 0
+        assert any("maxcore" in action.title.lower() for action in result)
 
-        # Create diagnostic for missing maxcore
+    def test_on_code_action_matches_diagnostic_code(self, server):
+        """Test the maxcore quick fix is offered from the diagnostic code alone."""
         diagnostic = Diagnostic(
-            range=Range(start=Position(line=0, character=0), end=Position(line=0, character=20)),
-            message="Missing %maxcore setting. Recommended: %maxcore 2000-4000",
-            severity=DiagnosticSeverity.Warning,
+            range=_LINE_0_RANGE,
+            message="",
+            code=int(DiagCode.MISSING_MAXCORE),
+            source="orca-lsp",
         )
 
         params = CodeActionParams(
-            text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-            range=Range(start=Position(line=0, character=0), end=Position(line=0, character=20)),
+            text_document=_DOC_ID,
+            range=_LINE_0_RANGE,
+            context=CodeActionContext(diagnostics=[diagnostic]),
+        )
+
+        server.workspace = _workspace(_FakeDoc())
+        result = server._on_code_action(params)
+
+        assert [action.title for action in result] == ["Add %maxcore 1000"]
+
+    def test_on_code_action_ignores_foreign_code(self, server):
+        """Test another server's diagnostic with the same code gets no maxcore fix."""
+        diagnostic = Diagnostic(
+            range=_LINE_0_RANGE,
+            message="Unused import",
+            code=int(DiagCode.MISSING_MAXCORE),
+            source="other-lsp",
+        )
+        params = CodeActionParams(
+            text_document=_DOC_ID,
+            range=_LINE_0_RANGE,
             context=CodeActionContext(diagnostics=[diagnostic]),
         )
 
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            result = server._on_code_action(params)
+        server.workspace = _workspace(_FakeDoc())
 
-            assert isinstance(result, list)
-            assert len(result) > 0
-            assert any("maxcore" in action.title.lower() for action in result)
+        assert server._on_code_action(params) == []
+
+    def test_on_code_action_maxcore_sized_to_geometry(self, server):
+        """Test the quick fix recommends %maxcore from the document's atom count."""
+        atoms = "\n".join(f"C {i}.0 0.0 0.0" for i in range(120))
+        source = f"! B3LYP def2-SVP\n* xyz 0 1\n{atoms}\n*"
+        server.workspace = _workspace(_FakeDoc(source=source))
+        params = CodeActionParams(
+            text_document=_DOC_ID,
+            range=_LINE_0_RANGE,
+            context=CodeActionContext(diagnostics=[_DIAG_MAXCORE]),
+        )
+
+        (action,) = server._on_code_action(params)
+
+        assert action.title == "Add %maxcore 4000"
+        assert action.edit.changes[_URI][0].new_text == "%maxcore 4000\n"
+
+    @pytest.mark.parametrize("n_atoms", [1, 60, 120, 250])
+    def test_on_code_action_inserts_recommended_maxcore(self, server, n_atoms):
+        """Test the quick fix inserts the value its diagnostic recommends."""
+        atoms = "\n".join(f"C {i}.0 0.0 0.0" for i in range(n_atoms))
+        source = f"! B3LYP def2-SVP\n* xyz 0 1\n{atoms}\n*"
+        (diagnostic,) = server._to_diagnostics(server.parser.parse(source))
+        server.workspace = _workspace(_FakeDoc(source=source))
+        params = CodeActionParams(
+            text_document=_DOC_ID,
+            range=_LINE_0_RANGE,
+            context=CodeActionContext(diagnostics=[diagnostic]),
+        )
+
+        (action,) = server._on_code_action(params)
+
+        assert action.edit.changes[_URI][0].new_text.strip() in diagnostic.message
+
+    def test_to_diagnostics_carries_codes(self, server):
+        """Test published diagnostics carry the parser's diagnostic codes."""
+        result = server.parser.parse("! B3LYP def2-SVP")
+        codes = {d.code for d in server._to_diagnostics(result)}
+        assert codes == {DiagCode.MISSING_GEOMETRY, DiagCode.MISSING_MAXCORE}
 
     def test_on_code_action_no_diagnostic(self, server):
         """Test _on_code_action with no diagnostics."""
-        mock_doc = MagicMock()
-        mock_doc.source = "! B3LYP def2-TZVP"
+        mock_doc = copy.copy(_ROUTE_DOC)
 
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
+        server.workspace = _workspace(mock_doc)
 
         params = CodeActionParams(
-            text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-            range=Range(start=Position(line=0, character=0), end=Position(line=0, character=20)),
+            text_document=_DOC_ID,
+            range=_LINE_0_RANGE,
             context=CodeActionContext(diagnostics=[]),
         )
 
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            result = server._on_code_action(params)
+        result = server._on_code_action(params)
 
-            assert isinstance(result, list)
-            assert len(result) == 0
+        assert isinstance(result, list)
+        assert len(result) == 0
 
     def test_on_code_action_other_diagnostic(self, server):
         """Test _on_code_action with non-maxcore diagnostic."""
-        mock_doc = MagicMock()
-        mock_doc.source = "! B3LYP def2-TZVP"
+        mock_doc = copy.copy(_ROUTE_DOC)
 
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
-
-        diagnostic = Diagnostic(
-            range=Range(start=Position(line=0, character=0), end=Position(line=0, character=20)),
-            message="Some other error",
-            severity=DiagnosticSeverity.Error,
-        )
+        server.workspace = _workspace(mock_doc)
 
         params = CodeActionParams(
-            text_document=TextDocumentIdentifier(uri="file:///test.orca"),
-            range=Range(start=Position(line=0, character=0), end=Position(line=0, character=20)),
-            context=CodeActionContext(diagnostics=[diagnostic]),
+            text_document=_DOC_ID,
+            range=_LINE_0_RANGE,
+            context=CodeActionContext(diagnostics=[_DIAG_OTHER]),
         )
 
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
-            result = server._on_code_action(params)
+        result = server._on_code_action(params)
+
+        assert isinstance(result, list)
+        # Should not add quick fix for non-maxcore diagnostics
+        assert len(result) == 0
+
+    def test_on_code_action_mixed_diagnostics(self, server):
+        """Test only the maxcore diagnostic of several gets a quick fix."""
+        server.workspace = _workspace(copy.copy(_ROUTE_DOC))
+        params = CodeActionParams(text_document=_DOC_ID, range=_LINE_0_RANGE, context=_CTX_BOTH)
 
-            assert isinstance(result, list)
-            # Should not add quick fix for non-maxcore diagnostics
-            assert len(result) == 0
+        result = server._on_code_action(params)
 
-    def test_on_did_open(self, server):
+        assert [action.title for action in result] == ["Add %maxcore 1000"]
+
+    def test_on_did_open(self, server, capture_publish):
         """Test _on_did_open event."""
-        mock_doc = MagicMock()
-        mock_doc.source = "! B3LYP def2-TZVP"
+        mock_doc = copy.copy(_ROUTE_DOC)
+
+        server.workspace = _workspace(mock_doc)
+
+        server._on_did_open(_URI_ONLY_PARAMS)
 
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
+        # Should validate and publish diagnostics
+        assert len(capture_publish) == 1
+
+    def test_on_did_change(self, server, capture_publish):
+        """Test _on_did_change event."""
+        mock_doc = _FakeDoc(source="! B3LYP def2-TZVP OPT")
 
-        server.publish_diagnostics = MagicMock()
+        server.workspace = _workspace(mock_doc)
+
+        server._on_did_change(_URI_ONLY_PARAMS)
+
+        # Should validate and publish diagnostics
+        assert len(capture_publish) == 1
+
+    async def test_on_did_change_debounces_bursts(self, server, capture_publish, monkeypatch):
+        """Rapid didChange notifications collapse into one validation."""
+        monkeypatch.setattr("orca_lsp.server._DEBOUNCE_DELAY", 0.01)
+
+        mock_doc = _FakeDoc(source="! B3LYP def2-TZVP OPT")
+
+        server.workspace = _workspace(mock_doc)
+
+        for _ in range(3):
+            server._on_did_change(_DID_CHANGE_PARAMS)
+
+        # Nothing is published until the edits pause
+        assert capture_publish == []
+
+        await server._pending[_URI]
+
+        assert len(capture_publish) == 1
+        assert server._pending == {}
+
+    async def test_superseded_task_keeps_newer_pending_entry(
+        self, server, capture_publish, monkeypatch
+    ):
+        """A validation superseded as it finishes leaves its replacement in _pending."""
+        monkeypatch.setattr("orca_lsp.server._DEBOUNCE_DELAY", 0.01)
+        server.workspace = _workspace(copy.copy(_ROUTE_DOC))
+
+        server._schedule_validation(_URI, delay=0)
+        first = server._pending[_URI]
+
+        # The next change lands after the first task's last await, so the
+        # first task still runs its finally while the new task is pending
+        publish = server._publish
+
+        def change_while_publishing(uri, diagnostics):
+            publish(uri, diagnostics)
+            server._on_did_change(_DID_CHANGE_PARAMS)
+
+        with patch.object(server, "_publish", side_effect=change_while_publishing):
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+        second = server._pending[_URI]
+        assert second is not first
+        await second
+        assert server._pending == {}
+        assert len(capture_publish) == 1
+
+    async def test_on_did_open_parses_off_loop(self, server, capture_publish):
+        """didOpen inside the event loop parses in a worker thread."""
+        mock_doc = copy.copy(_ROUTE_DOC)
+
+        server.workspace = _workspace(mock_doc)
 
         params = DidOpenTextDocumentParams(
             text_document=TextDocumentItem(
-                uri="file:///test.orca", language_id="orca", version=1, text="! B3LYP def2-TZVP"
+                uri=_URI, language_id="orca", version=1, text="! B3LYP def2-TZVP"
             )
         )
 
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
+        with patch("orca_lsp.server.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
             server._on_did_open(params)
+            await server._pending[_URI]
 
-            # Should validate and publish diagnostics
-            server.publish_diagnostics.assert_called_once()
+            to_thread.assert_called_once_with(server.parser.parse_cached, mock_doc.source)
+            assert len(capture_publish) == 1
+            uri, diagnostics = capture_publish[0]
+            assert uri == _URI
+            assert any("maxcore" in d.message for d in diagnostics)
 
-    def test_on_did_change(self, server):
-        """Test _on_did_change event."""
-        mock_doc = MagicMock()
-        mock_doc.source = "! B3LYP def2-TZVP OPT"
+    async def test_unchanged_source_skips_async_validation(self, server, capture_publish):
+        """A change that restores the validated text does not parse again."""
+        mock_doc = copy.copy(_ROUTE_DOC)
 
-        mock_workspace = MagicMock()
-        mock_workspace.get_text_document.return_value = mock_doc
+        server.workspace = _workspace(mock_doc)
 
-        server.publish_diagnostics = MagicMock()
+        await server._validate_document_async(_URI)
+        with patch("orca_lsp.server.asyncio.to_thread") as to_thread:
+            await server._validate_document_async(_URI)
 
-        params = DidChangeTextDocumentParams(
-            text_document=VersionedTextDocumentIdentifier(uri="file:///test.orca", version=2),
-            content_changes=[],
+        to_thread.assert_not_called()
+        assert len(capture_publish) == 1
+
+    async def test_superseded_validation_is_not_published(
+        self, server, capture_publish, monkeypatch
+    ):
+        """A change arriving before publication drops the stale diagnostics."""
+        monkeypatch.setattr("orca_lsp.server._DEBOUNCE_DELAY", 0.01)
+
+        mock_doc = copy.copy(_ROUTE_DOC)
+
+        server.workspace = _workspace(mock_doc)
+
+        server._schedule_validation(_URI, delay=0)
+        stale = server._pending[_URI]
+
+        # Supersede the first validation once its parse has finished
+        index_lines = server._index_lines
+
+        def change_after_parse(uri, content):
+            index_lines(uri, content)
+            server._on_did_change(_DID_CHANGE_PARAMS)
+
+        with patch.object(server, "_index_lines", side_effect=change_after_parse):
+            with pytest.raises(asyncio.CancelledError):
+                await stale
+
+        assert capture_publish == []
+        await server._pending[_URI]
+        assert len(capture_publish) == 1
+
+    def test_to_diagnostics_shares_ranges_per_line(self, server):
+        """Test diagnostics on the same line reuse one Range, in error-then-warning order."""
+        result = ParseResult(
+            errors=[{"message": "bad", "line": 2}, {"message": "worse", "line": 5}],
+            warnings=[{"message": "hmm", "line": 2}],
+        )
+
+        bad, worse, hmm = server._to_diagnostics(result)
+
+        assert [d.severity for d in (bad, worse, hmm)] == [
+            DiagnosticSeverity.Error,
+            DiagnosticSeverity.Error,
+            DiagnosticSeverity.Warning,
+        ]
+        assert bad.range is hmm.range
+        assert bad.range.start.line == 2
+        assert worse.range.start.line == 5
+
+
+class TestValidationCache:
+    """Test skipping unchanged documents and de-duplicating diagnostics."""
+
+    def _validate(self, server, doc, uri=_URI):
+        server.workspace = _workspace(doc)
+        server._validate_document(uri)
+
+    def test_identical_content_skips_parse(self, server):
+        """A repeated notification for identical content does not re-parse."""
+        doc = _FakeDoc(source="! B3LYP def2-TZVP")
+        self._validate(server, doc)
+
+        with patch.object(server.parser, "parse_cached") as parse_cached:
+            self._validate(server, doc)
+
+        parse_cached.assert_not_called()
+
+    def test_new_text_reparses(self, server, capture_publish):
+        """Different text is parsed again."""
+        self._validate(server, copy.copy(_B3LYP_DOC))
+        self._validate(server, _FakeDoc(source="! B3LYP\n%maxcore 4000"))
+
+        first, second = (diagnostics for _, diagnostics in capture_publish)
+        assert any("maxcore" in d.message for d in first)
+        assert not any("maxcore" in d.message for d in second)
+
+    def test_unchanged_diagnostics_not_republished(self, server, capture_publish):
+        """Publishing is skipped when the diagnostics did not change."""
+        self._validate(server, copy.copy(_B3LYP_DOC))
+        self._validate(server, _FakeDoc(source="! B3LYP OPT"))
+        assert len(capture_publish) == 1
+
+        self._validate(server, _FakeDoc(source="! B3LYP\n%maxcore 4000"))
+        assert len(capture_publish) == 2
+
+    def test_unchanged_source_skips_validation(self, server, capture_publish):
+        """Identical text from another document object is neither parsed nor published."""
+        self._validate(server, copy.copy(_B3LYP_DOC))
+
+        with patch.object(server.parser, "parse_cached") as parse_cached:
+            self._validate(server, _FakeDoc(source="! B3LYP"))
+
+        parse_cached.assert_not_called()
+        assert len(capture_publish) == 1
+
+    def test_new_version_with_identical_content_skips_parse(self, server, capture_publish):
+        """Only the content counts: a version bump with the same text is not re-parsed."""
+        self._validate(server, TextDocument(_URI, "! B3LYP", version=1))
+
+        with patch.object(server.parser, "parse_cached") as parse_cached:
+            self._validate(server, TextDocument(_URI, "! B3LYP", version=2))
+
+        parse_cached.assert_not_called()
+        assert len(capture_publish) == 1
+
+    def test_validated_sources_are_bounded(self, server):
+        """Only the most recently validated sources are remembered."""
+        for i in range(_PARSE_RESULTS_SIZE + 1):
+            self._validate(server, copy.copy(_B3LYP_DOC), uri=f"file:///{i}.inp")
+
+        assert len(server._validated) == _PARSE_RESULTS_SIZE
+        assert "file:///0.inp" not in server._validated
+
+    def test_published_keys_are_bounded(self, server, capture_publish):
+        """Only the most recently published documents are remembered."""
+        for i in range(_PARSE_RESULTS_SIZE + 1):
+            self._validate(server, copy.copy(_B3LYP_DOC), uri=f"file:///{i}.inp")
+
+        assert len(server._last_published) == _PARSE_RESULTS_SIZE
+        assert "file:///0.inp" not in server._last_published
+        assert len(capture_publish) == _PARSE_RESULTS_SIZE + 1
+
+    def test_did_open_always_publishes(self, server, capture_publish):
+        """Reopening a document publishes its diagnostics again."""
+        doc = copy.copy(_B3LYP_DOC)
+        self._validate(server, doc)
+
+        params = DidOpenTextDocumentParams(
+            text_document=TextDocumentItem(uri=_URI, language_id="orca", version=1, text="! B3LYP")
+        )
+        server.workspace = _workspace(doc)
+        server._on_did_open(params)
+
+        assert len(capture_publish) == 2
+
+    def test_reopen_same_version_with_new_text(self, server, capture_publish):
+        """A document reopened at the same version is diagnosed from its new text."""
+        self._validate(server, _FakeDoc(source="! B3LYP def2-SVP\n%maxcore 4000"))
+
+        params = DidOpenTextDocumentParams(
+            text_document=TextDocumentItem(
+                uri=_URI, language_id="orca", version=1, text=_VALID_SOURCE
+            )
         )
+        server.workspace = _workspace(_FakeDoc(source=_VALID_SOURCE))
+        server._on_did_open(params)
+
+        (_, before), (_, after) = capture_publish
+        assert any(d.code == DiagCode.MISSING_GEOMETRY for d in before)
+        assert not any(d.severity == DiagnosticSeverity.Error for d in after)
+
+
+class TestLineOffsets:
+    """Test line lookups served from the offsets recorded at validation."""
+
+    def _validate(self, server, doc):
+        server.workspace = _workspace(doc)
+        server._validate_document(doc.uri)
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "! B3LYP\r\n%pal\n  nprocs 4\nend",
+            "! B3LYP\r%max\r* xyz 0 1",
+            "! B3LYP\x0c%pal\u2028  nprocs 4\x85end",
+        ],
+        ids=["mixed-crlf", "cr-only", "unicode-breaks"],
+    )
+    def test_lines_match_document_lines(self, server, source):
+        """Offset-based lines equal what TextDocument.lines would return."""
+        doc = TextDocument("file:///test.inp", source, version=1)
+        expected = doc.lines
+        self._validate(server, doc)
+
+        with patch.object(TextDocument, "lines", new_callable=PropertyMock) as lines:
+            got = [server._get_line(doc, i) for i in range(len(expected))]
+
+        lines.assert_not_called()
+        assert got == expected
+
+    def test_replaced_source_falls_back_to_lines(self, server):
+        """Offsets recorded for an older source are not used."""
+        doc = TextDocument("file:///test.inp", "! B3LYP\n", version=1)
+        self._validate(server, doc)
+
+        doc._source = "%maxcore 4000\n"
+        assert server._get_line(doc, 0) == "%maxcore 4000\n"
+
+    def test_did_change_drops_offsets(self, server):
+        """A didChange discards the offsets of the previous source."""
+        doc = TextDocument("file:///test.inp", "! B3LYP\n", version=1)
+        self._validate(server, doc)
+        assert "file:///test.inp" in server._line_offsets
 
-        with patch.object(
-            type(server), "workspace", new_callable=PropertyMock, return_value=mock_workspace
-        ):
+        params = DidChangeTextDocumentParams(
+            text_document=VersionedTextDocumentIdentifier(uri="file:///test.inp", version=2),
+            content_changes=_CONTENT_CHANGES,
+        )
+        with patch.object(server, "_schedule_validation"):
             server._on_did_change(params)
 
-            # Should validate and publish diagnostics
-            server.publish_diagnostics.assert_called_once()
+        assert "file:///test.inp" not in server._line_offsets
 
 
 class TestGetCompletionsEdgeCases:
     """Test edge cases in _get_completions."""
 
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
-    def test_get_completions_empty_line(self, server):
-        """Test completions for empty line."""
-        completions = server._get_completions("", Position(line=0, character=0))
-        assert isinstance(completions, list)
-        # Empty line should return empty completions
-        assert len(completions) == 0
-
-    def test_get_completions_whitespace(self, server):
-        """Test completions for whitespace line."""
-        completions = server._get_completions("   ", Position(line=0, character=2))
-        assert isinstance(completions, list)
-
-    def test_get_completions_unknown_context(self, server):
-        """Test completions for unknown context."""
-        completions = server._get_completions("xyz", Position(line=0, character=3))
-        assert isinstance(completions, list)
-        # Unknown context should return empty completions
-        assert len(completions) == 0
-
-    def test_get_completions_method_context(self, server):
-        """Test completions for method context."""
-        completions = server._get_completions("! B3LYP ", Position(line=0, character=8))
-        assert isinstance(completions, list)
-        # Should include basis sets and job types
-        assert len(completions) > 0
-
-    def test_get_percent_completions_with_block_name(self, server):
-        """Test percent completions with partial block name."""
-        completions = server._get_percent_completions("%maxc")
-        assert isinstance(completions, list)
-        # Should include maxcore
-        assert any("maxcore" in item.label.lower() for item in completions)
-
-    def test_get_percent_completions_in_block(self, server):
-        """Test percent completions inside a block."""
-        # This tests the "if f'%{name}' in line.lower()" branch
-        completions = server._get_percent_completions("%maxcore ")
-        assert isinstance(completions, list)
-
-    def test_get_block_specific_completions_maxcore(self, server):
-        """Test block specific completions for maxcore."""
-        completions = server._get_block_specific_completions("maxcore")
-        assert isinstance(completions, list)
-        assert len(completions) > 0
-        # Should include memory values
-        assert any("MB" in item.label for item in completions)
-
-    def test_get_block_specific_completions_pal(self, server):
-        """Test block specific completions for pal."""
-        completions = server._get_block_specific_completions("pal")
-        assert isinstance(completions, list)
-        assert len(completions) > 0
-        # Should include nprocs
-        assert any("nprocs" in item.label for item in completions)
-
-    def test_get_block_specific_completions_method(self, server):
-        """Test block specific completions for method."""
-        completions = server._get_block_specific_completions("method")
-        assert isinstance(completions, list)
-        assert len(completions) > 0
-        # Should include dispersion corrections
-        assert any(item.label in ["D3", "D3BJ", "D4"] for item in completions)
-
-    def test_get_block_specific_completions_scf(self, server):
-        """Test block specific completions for scf."""
-        completions = server._get_block_specific_completions("scf")
-        assert isinstance(completions, list)
-        assert len(completions) > 0
-        # Should include SCF options
-        assert any(item.label in ["maxiter", "convergence", "NRMaxIt"] for item in completions)
-
-    def test_get_block_specific_completions_unknown(self, server):
-        """Test block specific completions for unknown block."""
-        completions = server._get_block_specific_completions("unknown")
-        assert isinstance(completions, list)
-        # Unknown block should return empty completions
-        assert len(completions) == 0
-
-
-class TestInGeometrySection:
-    """Test _in_geometry_section method."""
-
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
-    def test_in_geometry_section_valid(self, server):
-        """Test detection of geometry section line."""
-        assert server._in_geometry_section("O 0.0 0.0 0.0")
-        assert server._in_geometry_section("H 0.757160 0.586260 0.000000")
-        assert server._in_geometry_section("C -0.5 1.2 3.4")
-
-    def test_in_geometry_section_invalid(self, server):
-        """Test rejection of non-geometry lines."""
-        assert not server._in_geometry_section("! B3LYP")
-        assert not server._in_geometry_section("%maxcore 4000")
-        assert not server._in_geometry_section("* xyz 0 1")
-        assert not server._in_geometry_section("")
-
+    @pytest.mark.parametrize(
+        "block,expected,kind",
+        [
+            ("maxcore", "MB", CompletionItemKind.Value),  # memory values
+            ("pal", "nprocs", CompletionItemKind.Property),
+            ("method", "D3", CompletionItemKind.Value),  # dispersion corrections
+            ("scf", "maxiter", CompletionItemKind.Property),
+            ("unknown", None, None),
+        ],
+    )
+    def test_get_block_specific_completions(self, server, block, expected, kind):
+        """Test block specific completions for each known block and an unknown one."""
+        first = next(iter(server._get_block_specific_completions(block)), None)
+        if expected is None:
+            # Unknown block should return empty completions
+            assert first is None
+        else:
+            assert expected in first.label
+            assert first.kind == kind
+
+    def test_static_completions_built_once(self, server):
+        """Test static completion lists are reused and not mutated by requests."""
+        methods = server._get_method_completions()
+        assert server._get_method_completions() is methods
+        size = len(methods)
+        server._get_completions("! ", Position(line=0, character=2))
+        server._get_completions("! ", Position(line=0, character=2))
+        assert len(server._get_method_completions()) == size
+
+    def test_static_completions_shared_between_servers(self, server):
+        """Test completion lists are module-level and shared by all servers."""
+        other = ORCALanguageServer()
+        assert other._get_method_completions() is server._get_method_completions()
+        assert other._get_element_completions() is server._get_element_completions()
+
+    def test_hover_index_shared_between_servers(self, server):
+        """Test hover responses come from one module-level keyword index."""
+        other = _TestServer()
+        server.workspace = other.workspace = _workspace(_FakeDoc(lines=["! B3LYP"]))
+        assert server._on_hover(_HOVER_0_4) is other._on_hover(_HOVER_0_4)
+
+    def test_completion_item_resolve_fills_documentation(self, server):
+        """Test documentation is deferred to completionItem/resolve."""
+        item = next(i for i in server._get_method_completions() if i.label == "B3LYP")
+        assert item.documentation is None
+
+        resolved = server._on_completion_item_resolve(
+            CompletionItem(label=item.label, data=item.data)
+        )
+        assert resolved.documentation
 
+        block = server._get_percent_completions("%")[0]
+        resolved = server._on_completion_item_resolve(
+            CompletionItem(label=block.label, data=block.data)
+        )
+        assert resolved.documentation.startswith("Example: ")
+
+    def test_completion_resolve_is_advertised(self):
+        """Test initialize advertises resolveProvider, or clients never ask for docs."""
+        server = ORCALanguageServer()
+        result = server.lsp.lsp_initialize(InitializeParams(capabilities=ClientCapabilities()))
+        assert result.capabilities.completion_provider.resolve_provider is True
+
+    def test_completion_item_resolve_without_data(self, server):
+        """Test items without a known table tag are returned unchanged."""
+        item = CompletionItem(label="C", data={"table": "unknown", "name": "C"})
+        assert server._on_completion_item_resolve(item).documentation is None
+        assert server._on_completion_item_resolve(CompletionItem(label="x")) is not None
+
+
+def _labels(completions):
+    return [item.label for item in completions]
+
+
+@pytest.mark.coverage
+class TestPureHelpers:
+    """Test the server helpers that only depend on their arguments."""
+
+    @pytest.mark.parametrize(
+        "method,args,expected",
+        [
+            # Empty line and unknown context return no completions
+            ("_get_completions", ("", Position(line=0, character=0)), []),
+            ("_get_completions", ("   ", Position(line=0, character=2)), []),
+            ("_get_completions", ("xyz", Position(line=0, character=3)), []),
+            # Simple input offers methods, basis sets and job types
+            (
+                "_get_completions",
+                ("! B3LYP ", Position(line=0, character=8)),
+                _labels(_METHOD_COMPLETIONS + _BASIS_COMPLETIONS + _JOB_COMPLETIONS),
+            ),
+            # A partial block name is offered every block name
+            ("_get_percent_completions", ("%maxc",), list(PERCENT_BLOCKS)),
+            # Inside a block the block's own parameters are offered
+            (
+                "_get_percent_completions",
+                ("%maxcore ",),
+                ["1000 MB", "2000 MB", "4000 MB", "8000 MB", "16000 MB"],
+            ),
+            # Block names match case-insensitively...
+            ("_get_percent_completions", ("%PAL ",), ["nprocs"]),
+            # ...but a longer word starting with a block name does not
+            ("_get_percent_completions", ("%methods ",), []),
+            ("_in_geometry_section", ("O 0.0 0.0 0.0",), True),
+            ("_in_geometry_section", ("H 0.757160 0.586260 0.000000",), True),
+            ("_in_geometry_section", ("C -0.5 1.2 3.4",), True),
+            ("_in_geometry_section", ("! B3LYP",), False),
+            ("_in_geometry_section", ("%maxcore 4000",), False),
+            ("_in_geometry_section", ("* xyz 0 1",), False),
+            ("_in_geometry_section", ("",), False),
+        ],
+        ids=[
+            "completions-empty-line",
+            "completions-blank-line",
+            "completions-unknown-context",
+            "completions-simple-input",
+            "percent-partial-name",
+            "percent-maxcore-values",
+            "percent-name-case-insensitive",
+            "percent-name-prefix-no-match",
+            "geometry-atom-line",
+            "geometry-decimal-coords",
+            "geometry-negative-coords",
+            "geometry-simple-input",
+            "geometry-percent-block",
+            "geometry-header",
+            "geometry-empty-line",
+        ],
+    )
+    def test_pure_helper(self, server, method, args, expected):
+        """Test one helper call against its expected result; completions compare by label."""
+        result = getattr(server, method)(*args)
+        if isinstance(result, list):
+            result = _labels(result)
+        assert result == expected
+
+
+@pytest.mark.coverage
 class TestGetWordAtPosition:
     """Test _get_word_at_position method."""
 
-    @pytest.fixture
-    def server(self):
-        return ORCALanguageServer()
-
-    def test_get_word_at_start(self, server):
-        """Test getting word at start of line."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["B3LYP def2-TZVP"]
-        word = server._get_word_at_position(mock_doc, Position(line=0, character=0))
-        assert word == "B3LYP"
-
-    def test_get_word_at_end(self, server):
-        """Test getting word at end of line."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["B3LYP def2-TZVP"]
-        word = server._get_word_at_position(mock_doc, Position(line=0, character=15))
-        assert word == "TZVP"  # Only alphanumeric characters
-
-    def test_get_word_in_middle(self, server):
-        """Test getting word in middle of line."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! B3LYP def2-TZVP OPT"]
-        word = server._get_word_at_position(mock_doc, Position(line=0, character=6))
-        assert word == "B3LYP"
-
-    def test_get_word_with_symbols(self, server):
-        """Test getting word with symbols."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["! def2-TZVP"]
-        word = server._get_word_at_position(mock_doc, Position(line=0, character=5))
-        assert word == "def2"
-
-    def test_get_word_empty_line(self, server):
-        """Test getting word from empty line."""
-        mock_doc = MagicMock()
-        mock_doc.lines = [""]
-        word = server._get_word_at_position(mock_doc, Position(line=0, character=0))
-        assert word == ""
-
-    def test_get_word_only_spaces(self, server):
-        """Test getting word from line with only spaces."""
-        mock_doc = MagicMock()
-        mock_doc.lines = ["   "]
-        word = server._get_word_at_position(mock_doc, Position(line=0, character=1))
-        assert word == ""
+    @pytest.mark.parametrize(
+        "text,character,expected",
+        [
+            ("B3LYP def2-TZVP", 0, "B3LYP"),  # start of line
+            ("B3LYP def2-TZVP", 15, "def2-TZVP"),  # end of line; hyphens belong to the keyword
+            ("! B3LYP def2-TZVP OPT", 6, "B3LYP"),
+            ("! def2-TZVP", 5, "def2-TZVP"),
+            ("! MP2 cc-pVTZ", 4, "MP2"),
+            ("! B3LYP OPT", 9, "OPT"),
+            ("", 0, ""),
+            ("   ", 1, ""),
+            # Underscores, stars and parentheses stay inside a word
+            ("RI_J 6-31G* 6-31G(d)", 1, "RI_J"),
+            ("RI_J 6-31G* 6-31G(d)", 7, "6-31G*"),
+            ("RI_J 6-31G* 6-31G(d)", 14, "6-31G(d)"),
+            # A cursor right after a word returns that word
+            ("OPT FREQ", 3, "OPT"),
+        ],
+    )
+    def test_get_word(self, server, text, character, expected):
+        """Test the word found under the cursor on a single line."""
+        doc = _FakeDoc(lines=[text])
+        assert server._get_word_at_position(doc, Position(line=0, character=character)) == expected